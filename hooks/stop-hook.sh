@@ -36,6 +36,8 @@ SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 
 # Check if auto-explorer is active
 STATE_FILE=".claude/auto-explorer.local.md"
+# Transcript cursor written by check-rate-limits.py; removed with the state file
+CURSOR_FILE=".claude/auto-explorer-transcript-cursor.json"
 
 if [[ ! -f "$STATE_FILE" ]]; then
   # No active session - allow exit
@@ -48,7 +50,7 @@ PARSED=$(python "$SCRIPT_DIR/scripts/helpers.py" parse-frontmatter "$STATE_FILE"
 if [[ -z "$PARSED" ]]; then
   echo "Auto-Explorer: Failed to parse state file" >&2
   echo "   Stopping exploration. Use /auto-explore to start fresh." >&2
-  rm -f "$STATE_FILE"
+  rm -f "$STATE_FILE" "$CURSOR_FILE"
   exit 0
 fi
 
@@ -63,14 +65,14 @@ if [[ -z "$MODE" ]]; then MODE="research"; fi
 if [[ ! "$ITERATION" =~ ^[0-9]+$ ]]; then
   echo "Auto-Explorer: State file corrupted (iteration: '$ITERATION')" >&2
   echo "   Stopping exploration. Use /auto-explore to start fresh." >&2
-  rm -f "$STATE_FILE"
+  rm -f "$STATE_FILE" "$CURSOR_FILE"
   exit 0
 fi
 
 if [[ ! "$MAX_ITERATIONS" =~ ^[0-9]+$ ]]; then
   echo "Auto-Explorer: State file corrupted (max_iterations: '$MAX_ITERATIONS')" >&2
   echo "   Stopping exploration. Use /auto-explore to start fresh." >&2
-  rm -f "$STATE_FILE"
+  rm -f "$STATE_FILE" "$CURSOR_FILE"
   exit 0
 fi
 
@@ -165,7 +167,7 @@ if [[ -f "$SUMMARY_FLAG" ]]; then
   fi
   echo ""
   echo "   Next steps: Review summary with 'cat $OUTPUT_DIR/summary.md'"
-  rm -f "$STATE_FILE" "$SUMMARY_FLAG"
+  rm -f "$STATE_FILE" "$SUMMARY_FLAG" "$CURSOR_FILE"
   exit 0
 fi
 
@@ -178,7 +180,7 @@ if [[ $MAX_ITERATIONS -gt 0 ]] && [[ $ITERATION -ge $MAX_ITERATIONS ]]; then
   echo "   Next steps:"
   echo "     - Review findings: cat $OUTPUT_DIR/_index.md"
   echo "     - Resume session:  /auto-explore --resume $TOPIC_SLUG"
-  rm -f "$STATE_FILE"
+  rm -f "$STATE_FILE" "$CURSOR_FILE"
   exit 0
 fi
 
@@ -204,7 +206,7 @@ if [[ "$HAVE_TRANSCRIPT" == true ]]; then
     echo "     - Review findings: cat $OUTPUT_DIR/_index.md"
     echo "     - Adjust limits:   ~/.claude/auto-explorer-limits.json"
     echo "     - Resume session:  /auto-explore --resume $TOPIC_SLUG"
-    rm -f "$STATE_FILE"
+    rm -f "$STATE_FILE" "$CURSOR_FILE"
     exit 0
   fi
 fi
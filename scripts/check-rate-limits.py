@@ -8,24 +8,61 @@ compares against configured limits in auto-explorer-limits.json.
 Output: JSON with { "allowed": true/false, "details": [...] }
 """
 
+import functools
+import hashlib
 import importlib.util
 import json
+import mmap
 import os
+import re
 import sys
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timezone
 from pathlib import Path
 
 CLAUDE_DIR = Path.home() / ".claude"
 LIMITS_FILE = CLAUDE_DIR / "auto-explorer-limits.json"
 STATS_FILE = CLAUDE_DIR / "stats-cache.json"
+# Sidecar (next to the stats file) holding the precomputed daily token map
+DAILY_CACHE_NAME = "auto-explorer-daily-tokens.json"
 STATE_FILE = Path(".claude") / "auto-explorer.local.md"
+CURSOR_FILE = Path(".claude") / "auto-explorer-transcript-cursor.json"
 
-# Import parse_frontmatter from helpers.py (same directory)
-_helpers_path = Path(__file__).parent / "helpers.py"
-_spec = importlib.util.spec_from_file_location("helpers", str(_helpers_path))
-_helpers = importlib.util.module_from_spec(_spec)
-_spec.loader.exec_module(_helpers)
-_parse_frontmatter = _helpers.parse_frontmatter
+# Transcript lines without this key can't contribute tokens and are never decoded
+OUTPUT_TOKENS_KEY = b'"output_tokens"'
+# Top-level "usage" written as the object's last member, i.e. exactly one closing
+# brace follows it: {... "usage": {... "output_tokens": N ...}}. The integer can be
+# read without decoding the line; a nested usage object has more closers and
+# never matches.
+USAGE_TAIL_RE = re.compile(
+    rb'"usage"\s*:\s*\{[^{}]*?"output_tokens"\s*:\s*(\d+)\s*(?:,[^{}]*)?\}\s*\}\s*$'
+)
+
+# Bytes at the start of the transcript and just before the cursor offset that
+# are hashed to detect a rewritten transcript
+CURSOR_CHECK_BYTES = 64
+
+# State file frontmatter sits at the top; only this much is read to find started_at
+STATE_HEAD_CHARS = 4096
+FRONTMATTER_RE = re.compile(r"^---[ \t]*\r?\n(.*?)\r?\n---[ \t]*$", re.S | re.M)
+STARTED_AT_RE = re.compile(r'^started_at:[ \t]*"?([^"\r\n]*?)"?[ \t]*$', re.M)
+
+
+@functools.lru_cache(maxsize=1)
+def _helpers():
+    """Load helpers.py (same directory) on first use.
+
+    Only the oversized-frontmatter fallback needs it, so the common path
+    doesn't pay for executing the whole module on every invocation.
+    """
+    helpers_path = Path(__file__).parent / "helpers.py"
+    spec = importlib.util.spec_from_file_location("helpers", str(helpers_path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _parse_frontmatter(content):
+    return _helpers().parse_frontmatter(content)
 
 
 def load_json(path):
@@ -36,6 +73,66 @@ def load_json(path):
         return None
 
 
+def _stat_key(path):
+    """Return (st_mtime_ns, st_size) for path, or None if it can't be stat'ed."""
+    try:
+        st = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+@functools.lru_cache(maxsize=8)
+def _load_json_keyed(path, mtime_ns, size):
+    return load_json(path)
+
+
+def load_json_cached(path):
+    """load_json memoized on (path, mtime, size) — reparses only when the file changes."""
+    key = _stat_key(path)
+    if key is None:
+        return None
+    return _load_json_keyed(str(path), *key)
+
+
+def load_daily_tokens(stats_file):
+    """Return (daily_tokens, cumulative) for stats_file, or None if no stats are available.
+
+    daily_tokens is get_daily_tokens(); cumulative is cumulative_tokens() over it.
+    Both are persisted to a sidecar keyed by the stats file's mtime + size,
+    so an unchanged stats-cache.json is never re-parsed.
+    """
+    key = _stat_key(stats_file)
+    if key is None:
+        return None
+    stats_file = Path(stats_file)
+    cache_file = stats_file.parent / DAILY_CACHE_NAME
+    cached = load_json(cache_file)
+    if (
+        isinstance(cached, dict)
+        and cached.get("source") == str(stats_file)
+        and cached.get("key") == list(key)
+    ):
+        if cached.get("daily") is None:
+            return None
+        return cached["daily"], tuple(cached["cumulative"])
+
+    stats = load_json_cached(stats_file)
+    daily = get_daily_tokens(stats) if stats else None
+    cumulative = cumulative_tokens(daily) if daily is not None else None
+    try:
+        tmp = cache_file.with_name(cache_file.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"source": str(stats_file), "key": list(key),
+                       "daily": daily, "cumulative": cumulative}, f)
+        os.replace(tmp, cache_file)
+    except OSError as e:
+        print(f"auto-explorer: warning: failed to write daily token cache: {e}", file=sys.stderr)
+    if daily is None:
+        return None
+    return daily, cumulative
+
+
 def get_daily_tokens(stats):
     """Extract daily token counts from stats-cache.json."""
     result = {}
@@ -46,36 +143,175 @@ def get_daily_tokens(stats):
     return result
 
 
-def get_session_tokens(transcript_path):
-    """Count tokens used in the current session from transcript JSONL."""
+def cumulative_tokens(daily_tokens):
+    """Build prefix sums of daily token counts indexed by date ordinal.
+
+    Returns (base_ordinal, cum) where cum[k] is the total of all days
+    before base_ordinal + k. Entries with unparseable dates are skipped.
+    """
+    by_ordinal = {}
+    for date_str, tokens in daily_tokens.items():
+        try:
+            ordinal = date.fromisoformat(date_str).toordinal()
+        except ValueError:
+            continue
+        by_ordinal[ordinal] = by_ordinal.get(ordinal, 0) + tokens
+    if not by_ordinal:
+        return 0, [0]
+    base = min(by_ordinal)
+    cum = [0]
+    running = 0
+    for ordinal in range(base, max(by_ordinal) + 1):
+        running += by_ordinal.get(ordinal, 0)
+        cum.append(running)
+    return base, cum
+
+
+def window_tokens(cumulative, end_ordinal, days):
+    """Total tokens over the `days` days ending at end_ordinal (inclusive), in O(1)."""
+    base, cum = cumulative
+    last = len(cum) - 1
+
+    def prefix(ordinal):
+        return cum[min(max(ordinal - base, 0), last)]
+
+    return prefix(end_ordinal + 1) - prefix(end_ordinal + 1 - days)
+
+
+def _line_output_tokens(line):
+    """Return usage.output_tokens for one JSONL line (0 if absent or invalid).
+
+    Fast path reads the integer via USAGE_TAIL_RE when the top-level usage
+    object closes the line; anything else falls back to json.loads.
+    """
+    m = USAGE_TAIL_RE.match(line, max(line.rfind(b'"usage"'), 0))
+    if m:
+        return int(m.group(1))
+    try:
+        entry = json.loads(line)
+        usage = entry.get("usage", {})
+        # Count output tokens as the primary metric
+        return usage.get("output_tokens", 0)
+    except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+        return 0
+
+
+def _count_output_tokens(buf, start, end):
+    """Sum usage.output_tokens over the JSONL lines in buf[start:end].
+
+    buf may be bytes or an mmap. Lines are located by scanning for the
+    "output_tokens" key, so only lines that can contribute are examined.
+    """
     total = 0
+    pos = buf.find(OUTPUT_TOKENS_KEY, start, end)
+    while pos != -1:
+        nl = buf.rfind(b"\n", start, pos)
+        line_start = nl + 1 if nl != -1 else start
+        line_end = buf.find(b"\n", pos, end)
+        if line_end == -1:
+            line_end = end
+        total += _line_output_tokens(buf[line_start:line_end])
+        pos = buf.find(OUTPUT_TOKENS_KEY, line_end, end)
+    return total
+
+
+def _read_cursor(cursor_file):
+    data = load_json(cursor_file) if cursor_file else None
+    return data if isinstance(data, dict) else {}
+
+
+def _write_cursor(cursor_file, cursor):
+    """Atomically persist the transcript cursor (temp file + os.replace)."""
+    try:
+        cursor_file = Path(cursor_file)
+        cursor_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cursor_file.with_name(cursor_file.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cursor, f)
+        os.replace(tmp, cursor_file)
+    except OSError as e:
+        print(f"auto-explorer: warning: failed to write transcript cursor: {e}", file=sys.stderr)
+
+
+def _check_hash(f, offset):
+    """Hash the first CURSOR_CHECK_BYTES bytes and the CURSOR_CHECK_BYTES before offset.
+
+    Catches a transcript rewritten in place at its start or around the cursor;
+    a same-length rewrite strictly between the two windows goes unnoticed.
+    """
+    h = hashlib.md5(usedforsecurity=False)
+    f.seek(0)
+    h.update(f.read(min(CURSOR_CHECK_BYTES, offset)))
+    start = max(offset - CURSOR_CHECK_BYTES, 0)
+    f.seek(start)
+    h.update(f.read(offset - start))
+    return h.hexdigest()
+
+
+def get_session_tokens(transcript_path, cursor_file=None):
+    """Count tokens used in the current session from transcript JSONL.
+
+    With cursor_file, resumes from the byte offset recorded by the previous
+    call so only newly appended lines are parsed. The cursor is keyed by
+    transcript path + inode and a hash of the file's first bytes and of the
+    bytes just before the offset (see _check_hash); any mismatch (rotation,
+    truncation, rewrite of those bytes) falls back to a full scan.
+    """
     if not transcript_path or not os.path.isfile(transcript_path):
         return 0
+    path = os.path.abspath(transcript_path)
     try:
-        with open(transcript_path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    entry = json.loads(line)
-                    usage = entry.get("usage", {})
-                    # Count output tokens as the primary metric
-                    total += usage.get("output_tokens", 0)
-                except json.JSONDecodeError:
-                    continue
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            cursor = _read_cursor(cursor_file)
+            offset = cursor.get("offset", 0)
+            base_total = cursor.get("total", 0)
+            if not (
+                cursor.get("path") == path
+                and cursor.get("inode") == st.st_ino
+                and isinstance(offset, int)
+                and 0 < offset <= st.st_size
+                and cursor.get("check") == _check_hash(f, offset)
+            ):
+                offset, base_total = 0, 0
+
+            size = st.st_size
+            if size == offset:
+                return base_total
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # Only complete lines advance the cursor; a trailing partial
+                # line is counted for this call but re-read next time.
+                cut = mm.rfind(b"\n", offset, size) + 1 or offset
+                committed = base_total + _count_output_tokens(mm, offset, cut)
+                total = committed + _count_output_tokens(mm, cut, size)
+            if cursor_file and cut > offset:
+                _write_cursor(cursor_file, {
+                    "path": path,
+                    "inode": st.st_ino,
+                    "offset": cut,
+                    "check": _check_hash(f, cut),
+                    "total": committed,
+                })
     except Exception:
-        pass
+        return 0
     return total
 
 
 def get_session_start_time():
-    """Get session start time from auto-explorer state file."""
+    """Get session start time from auto-explorer state file.
+
+    Reads only the head of the file; falls back to a full parse if the
+    frontmatter block does not close within STATE_HEAD_CHARS.
+    """
     try:
         with open(STATE_FILE, "r", encoding="utf-8") as f:
-            content = f.read()
-        fields = _parse_frontmatter(content)
-        ts = fields.get("started_at", "")
+            head = f.read(STATE_HEAD_CHARS)
+            fm = FRONTMATTER_RE.search(head)
+            if fm:
+                m = STARTED_AT_RE.search(fm.group(1))
+                ts = m.group(1).strip() if m else ""
+            else:
+                ts = _parse_frontmatter(head + f.read()).get("started_at", "")
         if ts:
             return datetime.fromisoformat(ts.replace("Z", "+00:00"))
     except FileNotFoundError:
@@ -86,36 +322,44 @@ def get_session_start_time():
 
 
 def check_limits(transcript_path=None, threshold_override=None):
-    limits_config = load_json(LIMITS_FILE)
+    limits_config = load_json_cached(LIMITS_FILE)
     if not limits_config:
         # No limits configured — allow
         return {"allowed": True, "details": [{"window": "config", "status": "no limits file found, allowing"}]}
 
-    stats = load_json(STATS_FILE)
-    if not stats:
+    loaded = load_daily_tokens(STATS_FILE)
+    if loaded is None:
         # No stats available — allow (can't check)
         return {"allowed": True, "details": [{"window": "stats", "status": "no stats file found, allowing"}]}
+    daily_tokens, cumulative = loaded
 
     # Use override from --budget flag if provided, else fall back to config file
     threshold = threshold_override if threshold_override is not None else limits_config.get("threshold", 0.6)
     rate_limits = limits_config.get("rate_limits", {})
-    daily_tokens = get_daily_tokens(stats)
 
     now = datetime.now(timezone.utc)
-    today_str = now.strftime("%Y-%m-%d")
+    today = now.date()
+    today_str = today.isoformat()  # same as strftime("%Y-%m-%d"), without locale formatting
+    today_ord = today.toordinal()
 
     details = []
     allowed = True
 
-    # Compute session tokens once (avoids re-reading transcript for each window)
-    session_tokens = get_session_tokens(transcript_path) if transcript_path else 0
+    # Session tokens are computed on first use and shared by all windows, so the
+    # transcript is never read when no window has a positive limit
+    session_cache = []
+
+    def session_tokens():
+        if not session_cache:
+            session_cache.append(get_session_tokens(transcript_path, CURSOR_FILE) if transcript_path else 0)
+        return session_cache[0]
 
     # --- Daily check ---
     if "daily" in rate_limits:
         daily_limit = rate_limits["daily"].get("tokens", 0)
         if daily_limit > 0:
             today_usage = daily_tokens.get(today_str, 0)
-            today_total = today_usage + session_tokens
+            today_total = today_usage + session_tokens()
             pct = today_total / daily_limit
             exceeded = pct >= threshold
             if exceeded:
@@ -133,11 +377,8 @@ def check_limits(transcript_path=None, threshold_override=None):
     if "weekly" in rate_limits:
         weekly_limit = rate_limits["weekly"].get("tokens", 0)
         if weekly_limit > 0:
-            week_total = sum(
-                daily_tokens.get((now - timedelta(days=i)).strftime("%Y-%m-%d"), 0)
-                for i in range(7)
-            )
-            week_total += session_tokens
+            week_total = window_tokens(cumulative, today_ord, 7)
+            week_total += session_tokens()
             pct = week_total / weekly_limit
             exceeded = pct >= threshold
             if exceeded:
@@ -160,13 +401,14 @@ def check_limits(transcript_path=None, threshold_override=None):
             if start_time:
                 hours_running = (now - start_time).total_seconds() / 3600
 
-            pct = session_tokens / four_h_limit
+            four_h_used = session_tokens()
+            pct = four_h_used / four_h_limit
             exceeded = pct >= threshold
             if exceeded:
                 allowed = False
             details.append({
                 "window": "4h",
-                "used": session_tokens,
+                "used": four_h_used,
                 "limit": four_h_limit,
                 "threshold": threshold,
                 "pct": round(pct * 100, 1),
@@ -177,14 +419,44 @@ def check_limits(transcript_path=None, threshold_override=None):
     return {"allowed": allowed, "details": details}
 
 
+def _json_scalar(value):
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, int):
+        return repr(value)
+    # Floats go through json.dumps so inf/nan come out as Infinity/NaN, as before
+    return json.dumps(value)
+
+
+def format_result(result):
+    """Serialize a check_limits() result as compact JSON.
+
+    The schema is fixed (allowed + flat detail dicts of scalars), so it is
+    emitted directly instead of walking the structure with json.dumps.
+    """
+    details = ",".join(
+        "{" + ",".join(f'"{k}":{_json_scalar(v)}' for k, v in d.items()) + "}"
+        for d in result["details"]
+    )
+    allowed = "true" if result["allowed"] else "false"
+    return f'{{"allowed":{allowed},"details":[{details}]}}'
+
+
 if __name__ == "__main__":
-    # Args: [transcript_path] [threshold_override]
-    transcript_path = sys.argv[1] if len(sys.argv) > 1 else None
+    # Args: [transcript_path] [threshold_override] [--pretty]
+    pretty = "--pretty" in sys.argv[1:]
+    args = [a for a in sys.argv[1:] if a != "--pretty"]
+    transcript_path = args[0] if len(args) > 0 else None
     threshold_override = None
-    if len(sys.argv) > 2:
+    if len(args) > 1:
         try:
-            threshold_override = float(sys.argv[2])
+            threshold_override = float(args[1])
         except ValueError:
             pass
     result = check_limits(transcript_path, threshold_override)
-    print(json.dumps(result))
+    if pretty:
+        print(json.dumps(result, indent=2))
+    else:
+        sys.stdout.write(format_result(result) + "\n")
@@ -12,6 +12,7 @@ Usage:
   output_file: Optional HTML output path (default: <output_dir>/report.html)
 """
 
+import hashlib
 import html
 import os
 import re
@@ -21,16 +22,55 @@ from pathlib import Path
 
 # --- Markdown to HTML conversion ---
 
+# Inline patterns, applied in this order: bold, italic, code, links. Italic
+# runs on the bold-converted text, so *a **b** c* still becomes one <em>.
+_RE_BOLD = re.compile(r'\*\*(.+?)\*\*')
+_RE_ITALIC = re.compile(r'(?<!\*)\*([^*]+?)\*(?!\*)')
+_RE_CODE = re.compile(r'`(.+?)`')
+_RE_LINK = re.compile(r'\[(.+?)\]\((.+?)\)')
+# Code spans are swapped for \x00<n>\x00 slots while the other passes run, so
+# their contents stay literal
+_RE_CODE_SLOT = re.compile(r'\x00(\d+)\x00')
+
+# Characters html.escape() would rewrite; most prose lines contain none
+_NEEDS_ESCAPE = re.compile(r'[<>&"\']')
+
+
 def convert_inline(text):
     """Convert inline Markdown to HTML: bold, italic, code, links."""
-    text = html.escape(text)
-    text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', text)
-    text = re.sub(r'(?<!\*)\*([^*]+?)\*(?!\*)', r'<em>\1</em>', text)
-    text = re.sub(r'`(.+?)`', r'<code>\1</code>', text)
-    text = re.sub(r'\[(.+?)\]\((.+?)\)', r'<a href="\2">\1</a>', text)
+    if _NEEDS_ESCAPE.search(text):
+        text = html.escape(text)
+    # Each pass only runs when its marker is present; most lines need none
+    codes = None
+    if '`' in text and '\x00' not in text:
+        codes = []
+
+        def stash(m):
+            codes.append(m.group(1))
+            return f'\x00{len(codes) - 1}\x00'
+
+        text = _RE_CODE.sub(stash, text)
+    if '*' in text:
+        text = _RE_BOLD.sub(r'<strong>\1</strong>', text)
+        text = _RE_ITALIC.sub(r'<em>\1</em>', text)
+    if '`' in text:
+        text = _RE_CODE.sub(r'<code>\1</code>', text)
+    if '](' in text:
+        text = _RE_LINK.sub(r'<a href="\2">\1</a>', text)
+    if codes:
+        text = _RE_CODE_SLOT.sub(lambda m: f'<code>{codes[int(m.group(1))]}</code>', text)
     return text
 
 
+# Block-level patterns used per line by md_to_html
+_RE_HEADER = re.compile(r'^(#{1,6})\s+(.*)')
+_RE_HR = re.compile(r'^[-*_]{3,}\s*$')
+_RE_UL = re.compile(r'^[-*+]\s+(.*)')
+_RE_OL = re.compile(r'^\d+\.\s+(.*)')
+_RE_TABLE_SEP = re.compile(r'^[-:]+$')
+_RE_ANCHOR = re.compile(r'[^a-z0-9]+')
+
+
 def render_table(rows):
     """Render parsed table rows to HTML."""
     if len(rows) < 1:
@@ -49,118 +89,213 @@ def render_table(rows):
 
 def md_to_html(text):
     """Convert Markdown text to HTML."""
-    lines = text.split('\n')
-    result = []
-    in_code = False
-    code_lang = ''
-    code_buf = []
-    table_buf = []
-    list_buf = []
-    list_type = None
-
-    def flush_list():
-        nonlocal list_buf, list_type
-        if list_buf:
-            tag = list_type or 'ul'
-            items = ''.join(f'<li>{convert_inline(l)}</li>' for l in list_buf)
-            result.append(f'<{tag}>{items}</{tag}>')
-            list_buf = []
-            list_type = None
-
-    def flush_table():
-        nonlocal table_buf
-        if table_buf:
+    return _MdParser().parse(text)
+
+
+class _MdParser:
+    """Line-oriented Markdown parser state; one instance per document."""
+
+    __slots__ = ('result', 'in_code', 'code_lang', 'code_buf', 'table_buf',
+                 'list_buf', 'list_type')
+
+    def __init__(self):
+        self.result = []
+        self.in_code = False
+        self.code_lang = ''
+        self.code_buf = []
+        self.table_buf = []
+        self.list_buf = []
+        self.list_type = None
+
+    def flush_list(self):
+        if self.list_buf:
+            tag = self.list_type or 'ul'
+            items = ''.join(f'<li>{convert_inline(l)}</li>' for l in self.list_buf)
+            self.result.append(f'<{tag}>{items}</{tag}>')
+            self.list_buf = []
+            self.list_type = None
+
+    def flush_table(self):
+        if self.table_buf:
             rows = []
-            for line in table_buf:
+            for line in self.table_buf:
                 cells = [c.strip() for c in line.strip('|').split('|')]
                 rows.append(cells)
             # Remove separator row (row 1 with ---/:--)
-            if len(rows) > 1 and all(re.match(r'^[-:]+$', c) for c in rows[1]):
+            if len(rows) > 1 and all(_RE_TABLE_SEP.match(c) for c in rows[1]):
                 rows.pop(1)
-            result.append(render_table(rows))
-            table_buf = []
-
-    for line in lines:
-        # Code block fences
-        if line.strip().startswith('```'):
-            if in_code:
-                escaped = html.escape('\n'.join(code_buf))
-                cls = f' class="language-{code_lang}"' if code_lang else ''
-                result.append(f'<pre><code{cls}>{escaped}</code></pre>')
-                code_buf = []
-                in_code = False
-                code_lang = ''
-            else:
-                flush_list()
-                flush_table()
-                in_code = True
-                code_lang = line.strip()[3:].strip()
-            continue
-
-        if in_code:
-            code_buf.append(line)
-            continue
-
-        stripped = line.strip()
-
-        # Empty line — flush state
-        if not stripped:
-            flush_list()
-            flush_table()
-            continue
-
-        # Headers
-        hm = re.match(r'^(#{1,6})\s+(.*)', stripped)
-        if hm:
-            flush_list()
-            flush_table()
-            lvl = len(hm.group(1))
-            txt = hm.group(2)
-            anchor = re.sub(r'[^a-z0-9]+', '-', txt.lower()).strip('-')
-            result.append(f'<h{lvl} id="{anchor}">{convert_inline(txt)}</h{lvl}>')
-            continue
-
-        # Horizontal rule
-        if re.match(r'^[-*_]{3,}\s*$', stripped):
-            flush_list()
-            flush_table()
-            result.append('<hr>')
-            continue
-
-        # Table row
-        if '|' in stripped and stripped.startswith('|'):
-            flush_list()
-            table_buf.append(stripped)
-            continue
-
-        # Unordered list
-        ul = re.match(r'^[-*+]\s+(.*)', stripped)
-        if ul:
-            flush_table()
-            if list_type != 'ul':
-                flush_list()
-                list_type = 'ul'
-            list_buf.append(ul.group(1))
-            continue
-
-        # Ordered list
-        ol = re.match(r'^\d+\.\s+(.*)', stripped)
-        if ol:
-            flush_table()
-            if list_type != 'ol':
-                flush_list()
-                list_type = 'ol'
-            list_buf.append(ol.group(1))
-            continue
-
-        # Paragraph
-        flush_list()
-        flush_table()
-        result.append(f'<p>{convert_inline(stripped)}</p>')
-
-    flush_list()
-    flush_table()
-    return '\n'.join(result)
+            self.result.append(render_table(rows))
+            self.table_buf = []
+
+    def parse(self, text):
+        result = self.result
+        for line in text.split('\n'):
+            # Code block fences
+            if line.strip().startswith('```'):
+                if self.in_code:
+                    escaped = html.escape('\n'.join(self.code_buf))
+                    cls = f' class="language-{self.code_lang}"' if self.code_lang else ''
+                    result.append(f'<pre><code{cls}>{escaped}</code></pre>')
+                    self.code_buf = []
+                    self.in_code = False
+                    self.code_lang = ''
+                else:
+                    self.flush_list()
+                    self.flush_table()
+                    self.in_code = True
+                    self.code_lang = line.strip()[3:].strip()
+                continue
+
+            if self.in_code:
+                self.code_buf.append(line)
+                continue
+
+            stripped = line.strip()
+
+            # Empty line — flush state
+            if not stripped:
+                self.flush_list()
+                self.flush_table()
+                continue
+
+            # Headers
+            hm = _RE_HEADER.match(stripped)
+            if hm:
+                self.flush_list()
+                self.flush_table()
+                lvl = len(hm.group(1))
+                txt = hm.group(2)
+                anchor = _RE_ANCHOR.sub('-', txt.lower()).strip('-')
+                result.append(f'<h{lvl} id="{anchor}">{convert_inline(txt)}</h{lvl}>')
+                continue
+
+            # Horizontal rule
+            if _RE_HR.match(stripped):
+                self.flush_list()
+                self.flush_table()
+                result.append('<hr>')
+                continue
+
+            # Table row
+            if '|' in stripped and stripped.startswith('|'):
+                self.flush_list()
+                self.table_buf.append(stripped)
+                continue
+
+            # Unordered list
+            ul = _RE_UL.match(stripped)
+            if ul:
+                self.flush_table()
+                if self.list_type != 'ul':
+                    self.flush_list()
+                    self.list_type = 'ul'
+                self.list_buf.append(ul.group(1))
+                continue
+
+            # Ordered list
+            ol = _RE_OL.match(stripped)
+            if ol:
+                self.flush_table()
+                if self.list_type != 'ol':
+                    self.flush_list()
+                    self.list_type = 'ol'
+                self.list_buf.append(ol.group(1))
+                continue
+
+            # Paragraph
+            self.flush_list()
+            self.flush_table()
+            result.append(f'<p>{convert_inline(stripped)}</p>')
+
+        self.flush_list()
+        self.flush_table()
+        return '\n'.join(result)
+
+
+# --- Render cache ---
+
+# Rendered sections are cached in <output_dir>/.cache/<stem>-<hash>.html, keyed by
+# a hash of the Markdown source. Bump CACHE_VERSION when md_to_html output changes.
+CACHE_DIR_NAME = '.cache'
+CACHE_VERSION = 5
+CACHE_DIGEST_SIZE = 8
+
+
+def _cache_digest(content):
+    h = hashlib.blake2b(digest_size=CACHE_DIGEST_SIZE)
+    h.update(str(CACHE_VERSION).encode('ascii'))
+    h.update(content.encode('utf-8'))
+    return h.hexdigest()
+
+
+def _read_cached(cache_file):
+    """Return the cached HTML for a cache entry, or None on miss."""
+    try:
+        return cache_file.read_text(encoding='utf-8')
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cached(cache_file, file_html):
+    """Write a cache entry atomically (temp file + os.replace), so an interrupted
+    export never leaves a truncated entry that a later run reads as a hit."""
+    tmp = cache_file.with_name(cache_file.name + '.tmp')
+    try:
+        cache_file.parent.mkdir(exist_ok=True)
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(file_html)
+        os.replace(tmp, cache_file)
+    except OSError:
+        pass
+
+
+# Length of the '-<digest>.html' tail of a cache entry name
+_CACHE_SUFFIX_LEN = len('-.html') + 2 * CACHE_DIGEST_SIZE
+
+
+def _prune_cache(cache_dir, current):
+    """Drop renders of previous versions of files; current maps stem -> entry name."""
+    try:
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                name = entry.name
+                if (name.endswith('.html') and len(name) > _CACHE_SUFFIX_LEN
+                        and name[-_CACHE_SUFFIX_LEN] == '-'
+                        and current.get(name[:-_CACHE_SUFFIX_LEN], name) != name):
+                    os.unlink(entry.path)
+    except OSError:
+        pass
+
+
+def render_file(md_file, content, cache_dir=None):
+    """Render one Markdown file, reusing a cached render when the source is unchanged."""
+    return render_files([md_file], [content], cache_dir)[0]
+
+
+def render_files(md_files, contents, cache_dir=None):
+    """Render Markdown files, converting only cache misses.
+
+    Returns a list of HTML strings in md_files order.
+    """
+    results = []
+    written = {}
+    for md_file, content in zip(md_files, contents):
+        cache_file = None
+        if cache_dir is not None:
+            cache_file = cache_dir / f'{md_file.stem}-{_cache_digest(content)}.html'
+            cached = _read_cached(cache_file)
+            if cached is not None:
+                results.append(cached)
+                continue
+        file_html = md_to_html(content)
+        if cache_file is not None:
+            _write_cached(cache_file, file_html)
+            written[md_file.stem] = cache_file.name
+        results.append(file_html)
+    # One directory listing per call, covering every file just re-rendered
+    if written:
+        _prune_cache(cache_dir, written)
+    return results
 
 
 # --- HTML template ---
@@ -213,6 +348,31 @@ strong { font-weight: 600; }
 @media print { nav { display: none; } main { margin-left: 0; } }
 """
 
+# The stylesheet never varies between reports, so it is encoded once
+CSS_BYTES = CSS.encode('utf-8')
+
+# Fixed report template, pre-encoded around its variable slots:
+#   REPORT_HEAD <title> REPORT_STYLE <title> REPORT_NAV <nav links>
+#   REPORT_MAIN <sections> REPORT_TAIL
+REPORT_HEAD = b"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>"""
+REPORT_STYLE = ' — Auto-Explorer Report</title>\n<style>'.encode('utf-8') + CSS_BYTES + b"""</style>
+</head>
+<body>
+<nav>
+<h2>Auto-Explorer</h2>
+<p style="margin-bottom:1rem;color:var(--muted);font-size:0.8rem">"""
+REPORT_NAV = b'</p>\n'
+REPORT_MAIN = b'</nav>\n<main>\n'
+REPORT_TAIL = b"""<div class="generated">Generated by Auto-Explorer HTML Export</div>
+</main>
+</body>
+</html>"""
+
 
 def generate_report(output_dir, output_file=None):
     """Generate a single-file HTML report from a findings directory.
@@ -234,16 +394,22 @@ def generate_report(output_dir, output_file=None):
     else:
         output_file = Path(output_file)
 
-    # Discover and sort Markdown files
-    md_files = sorted(
-        f for f in output_dir.iterdir()
-        if f.suffix == '.md' and f.name != '_index.md'
-    )
+    # Discover and sort Markdown files (scandir reuses dirent type info, no per-file stat)
+    md_files = []
+    has_index = False
+    with os.scandir(output_dir) as it:
+        for entry in it:
+            if not entry.name.endswith('.md') or not entry.is_file():
+                continue
+            if entry.name == '_index.md':
+                has_index = True
+            else:
+                md_files.append(Path(entry.path))
+    md_files.sort()
 
     # Put _index.md first if it exists
-    index_file = output_dir / '_index.md'
-    if index_file.exists():
-        md_files.insert(0, index_file)
+    if has_index:
+        md_files.insert(0, output_dir / '_index.md')
 
     if not md_files:
         print(f"Error: No Markdown files found in {output_dir}", file=sys.stderr)
@@ -256,52 +422,31 @@ def generate_report(output_dir, output_file=None):
     else:
         topic = output_dir.name
 
-    # Build navigation and content
-    nav_items = []
-    sections = []
-
-    for md_file in md_files:
-        content = md_file.read_text(encoding='utf-8')
-        file_id = md_file.stem
-        file_html = md_to_html(content)
-
-        # Extract first h1 as section title, or use filename
-        h1_match = re.search(r'^#\s+(.+)', content, re.MULTILINE)
-        title = h1_match.group(1) if h1_match else md_file.stem
-
-        nav_items.append(f'<a href="#{file_id}">{html.escape(md_file.name)}</a>')
-        sections.append(
-            f'<div class="section" id="{file_id}">'
-            f'<div class="file-label">{html.escape(md_file.name)}</div>'
-            f'{file_html}</div>'
-        )
-
-    nav_html = '\n'.join(nav_items)
-    content_html = '\n'.join(sections)
     title_escaped = html.escape(topic)
 
-    report = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>{title_escaped} — Auto-Explorer Report</title>
-<style>{CSS}</style>
-</head>
-<body>
-<nav>
-<h2>Auto-Explorer</h2>
-<p style="margin-bottom:1rem;color:var(--muted);font-size:0.8rem">{title_escaped}</p>
-{nav_html}
-</nav>
-<main>
-{content_html}
-<div class="generated">Generated by Auto-Explorer HTML Export</div>
-</main>
-</body>
-</html>"""
+    # Render sections first, then assemble the whole report into one buffer
+    cache_dir = output_dir / CACHE_DIR_NAME
+    contents = [md_file.read_text(encoding='utf-8') for md_file in md_files]
+    rendered = render_files(md_files, contents, cache_dir)
+    sections = list(zip(md_files, rendered))
+
+    nav = ''.join(
+        f'<a href="#{md_file.stem}">{html.escape(md_file.name)}</a>\n'
+        for md_file, _ in sections
+    )
+    body = ''.join(
+        f'<div class="section" id="{md_file.stem}">'
+        f'<div class="file-label">{html.escape(md_file.name)}</div>'
+        f'{file_html}</div>\n'
+        for md_file, file_html in sections
+    )
+    title_bytes = title_escaped.encode('utf-8')
 
-    output_file.write_text(report, encoding='utf-8')
+    with open(output_file, 'wb') as f:
+        f.write(b''.join((
+            REPORT_HEAD, title_bytes, REPORT_STYLE, title_bytes, REPORT_NAV,
+            nav.encode('utf-8'), REPORT_MAIN, body.encode('utf-8'), REPORT_TAIL,
+        )))
     return output_file
 
 
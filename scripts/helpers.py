@@ -25,50 +25,121 @@ CLI subcommands:
   extract-topic-words <topic> [min_len]  Extract topic words for repeat detection
   append-telemetry <jsonl> <slug> <iter> <mode> <tokens> <kb> <subtopic>  Append JSONL telemetry
   json-output <reason> <system_message>   Output stop hook JSON response
+  batch                                   Run a JSON list of {cmd, args, stdin} from stdin in one process;
+                                          prints a JSON list of outputs (null for failed commands)
 """
 
+import functools
 import hashlib
+import importlib.util
 import json
 import os
 import re
+import stat
 import sys
+import time
 import unicodedata
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 
 # --- Frontmatter parsing ---
 
+# A delimiter line: '---' with optional surrounding whitespace
+_FM_DELIM_RE = re.compile(r'^[^\S\n]*---[^\S\n]*$', re.MULTILINE)
+
+
+def _split_frontmatter(content):
+    """Split content into (fields, body) around the first --- delimited block.
+
+    Only the frontmatter slice is split into lines. body is everything after
+    the closing delimiter, or the whole content if there is no closed block.
+    """
+    fields = {}
+    opening = _FM_DELIM_RE.search(content)
+    if not opening:
+        return fields, content
+    closing = _FM_DELIM_RE.search(content, opening.end())
+    block_end = closing.start() if closing else len(content)
+    for line in content[opening.end():block_end].split('\n'):
+        key, sep, val = line.partition(':')
+        if sep:
+            fields[key.strip()] = val.strip().strip('"')
+    body = content[closing.end():] if closing else content
+    return fields, body
+
+
 def parse_frontmatter(content):
     """Parse YAML-like frontmatter from a state file.
 
     Returns dict of key-value pairs from the --- delimited block.
     """
+    return _split_frontmatter(content)[0]
+
+
+def _text_lines(f):
+    """Yield the lines of binary file f split like text mode's universal newlines.
+
+    Decoding line by line means bytes past the point where the caller stops
+    reading are never decoded. A line with a lone '\r' is split there too.
+    """
+    for raw in f:
+        line = raw.decode('utf-8')
+        if '\r' in line:
+            yield from line.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        else:
+            yield line
+
+
+def read_frontmatter(path):
+    """Parse frontmatter directly from a file, reading no further than the closing ---.
+
+    Same result as parse_frontmatter() on the file's text, with '\r\n' and
+    '\r' line endings handled as a text-mode read would.
+    """
     fields = {}
     in_fm = False
-    for line in content.split('\n'):
-        if line.strip() == '---':
-            if in_fm:
-                break
-            in_fm = True
-            continue
-        if in_fm and ':' in line:
-            key, val = line.split(':', 1)
-            fields[key.strip()] = val.strip().strip('"')
+    with open(path, 'rb') as f:
+        for line in _text_lines(f):
+            if line.strip() == '---':
+                if in_fm:
+                    break
+                in_fm = True
+                continue
+            if not in_fm:
+                continue
+            key, sep, val = line.partition(':')
+            if sep:
+                fields[key.strip()] = val.strip().strip('"')
     return fields
 
 
 # --- Slug generation ---
 
+# Byte translation table: A-Z folds to a-z, a-z and 0-9 pass through,
+# every other byte becomes '-'
+_SLUG_TABLE = bytes(
+    c + 32 if 65 <= c <= 90 else c if (48 <= c <= 57 or 97 <= c <= 122) else 45
+    for c in range(256)
+)
+
+
+@functools.lru_cache(maxsize=256)
 def make_slug(topic):
     """Generate a URL-safe slug from a topic string.
 
     Handles Unicode (including CJK) by normalizing to ASCII.
     Falls back to MD5 hash prefix if no ASCII chars remain.
     """
-    normalized = unicodedata.normalize('NFKD', topic).encode('ascii', 'ignore').decode('ascii')
-    slug = re.sub(r'[^a-z0-9]+', '-', normalized.lower().strip()).strip('-')
+    # NFKD leaves pure ASCII unchanged, so only non-ASCII input needs the round-trip
+    if topic.isascii():
+        normalized = topic.encode('ascii')
+    else:
+        normalized = unicodedata.normalize('NFKD', topic).encode('ascii', 'ignore')
+    # Translate, then drop empty pieces: collapses '-' runs and trims both ends
+    slug = b'-'.join(filter(None, normalized.translate(_SLUG_TABLE).split(b'-'))).decode('ascii')
     if not slug:
-        slug = 'topic-' + hashlib.md5(topic.encode('utf-8')).hexdigest()[:8]
+        # MD5 keeps existing findings directories stable; it is not used for security
+        slug = 'topic-' + hashlib.md5(topic.encode('utf-8'), usedforsecurity=False).hexdigest()[:8]
     if len(slug) > 50:
         slug = slug[:50].rstrip('-')
     return slug
@@ -81,6 +152,9 @@ BUILD_PATTERNS = [
     r'^(設計|建立|開發|實作|修復|重構|新增|部署|撰寫|建置|優化|更新|設定|安裝|改善|整合|自動化|提取|刪除|替換|移動|合併|清理|除錯|修補|產生|升級|進化)',
 ]
 
+# Both patterns are anchored, so one alternation matched at position 0 is equivalent
+_BUILD_RE = re.compile('|'.join(BUILD_PATTERNS))
+
 # Polite prefixes stripped before build pattern matching.
 # Ordered longest-first to prevent partial matches (e.g., "請協助我" before "請").
 POLITE_PREFIXES_EN = [
@@ -93,22 +167,29 @@ POLITE_PREFIXES_CJK = [
     '協助我', '幫我', '協助', '幫忙', '自我', '請',
 ]
 
+# Alternatives are sorted longest-first, so the longest matching prefix wins
+# even if a shorter one is later added ahead of it in the lists above.
+_POLITE_RE = re.compile(
+    '^(?:' + '|'.join(re.escape(p) for p in sorted(POLITE_PREFIXES_EN + POLITE_PREFIXES_CJK,
+                                                   key=len, reverse=True)) + r')\s*'
+)
+# Most topics start with none of these characters and skip the regex entirely
+_POLITE_FIRST_CHARS = frozenset(p[0] for p in POLITE_PREFIXES_EN + POLITE_PREFIXES_CJK)
 
+
+@functools.lru_cache(maxsize=256)
 def _strip_polite_prefix(topic):
     """Strip common polite prefixes so the action verb is at position 0.
 
     Handles both English ("please build", "can you fix") and
     CJK ("請進化", "請自我進化", "幫我建立") prefixes.
     """
-    for prefix in POLITE_PREFIXES_EN:
-        if topic.startswith(prefix):
-            return topic[len(prefix):].lstrip()
-    for prefix in POLITE_PREFIXES_CJK:
-        if topic.startswith(prefix):
-            return topic[len(prefix):].lstrip()
-    return topic
+    if topic[:1] not in _POLITE_FIRST_CHARS:
+        return topic
+    return _POLITE_RE.sub('', topic, count=1)
 
 
+@functools.lru_cache(maxsize=256)
 def detect_mode(topic):
     """Detect build vs research mode from topic wording.
 
@@ -116,47 +197,115 @@ def detect_mode(topic):
     Strips polite prefixes first (e.g., "please build" → "build").
     """
     lower_topic = _strip_polite_prefix(topic.lower().strip())
-    for pat in BUILD_PATTERNS:
-        if re.search(pat, lower_topic):
-            return 'build'
-    return 'research'
+    return 'build' if _BUILD_RE.match(lower_topic) else 'research'
 
 
 # --- Tag extraction ---
 
+_TAG_RE = re.compile(r'<explore-(?P<kind>done|next)>(?P<body>.*?)</explore-(?P=kind)>', re.DOTALL)
+# Per-tag patterns, only needed when one tag's opening sits inside the other
+_TAG_FALLBACK_RE = {
+    'done': re.compile(r'<explore-done>(?P<body>.*?)</explore-done>', re.DOTALL),
+    'next': re.compile(r'<explore-next>(?P<body>.*?)</explore-next>', re.DOTALL),
+}
+_WS_RE = re.compile(r'\s+')
+
+
 def extract_tags(text):
     """Extract <explore-done> and <explore-next> tags from text.
 
     Returns (done, next_topic) tuple. Whitespace is normalized.
     """
+    # One scan for both tags; the first occurrence of each wins
+    found = {}
+    for m in _TAG_RE.finditer(text):
+        found.setdefault(m.group('kind'), m)
+        if len(found) == 2:
+            break
+    # The fused scan skips an opening tag nested inside the other tag;
+    # re-search that tag on its own so results match independent searches
+    for kind, pattern in _TAG_FALLBACK_RE.items():
+        m = found.get(kind)
+        first = text.find(f'<explore-{kind}>')
+        if first != -1 and (m is None or m.start() != first):
+            found[kind] = pattern.search(text)
     done = next_t = ''
-    done_match = re.search(r'<explore-done>(.*?)</explore-done>', text, re.DOTALL)
-    if done_match:
-        done = re.sub(r'\s+', ' ', done_match.group(1).strip())
-    next_match = re.search(r'<explore-next>(.*?)</explore-next>', text, re.DOTALL)
-    if next_match:
-        next_t = re.sub(r'\s+', ' ', next_match.group(1).strip())
+    if found.get('done'):
+        done = _WS_RE.sub(' ', found['done'].group('body').strip())
+    if found.get('next'):
+        next_t = _WS_RE.sub(' ', found['next'].group('body').strip())
     return done, next_t
 
 
+# --- Time helpers ---
+
+# (wall clock, monotonic clock) read once; later "now" values are derived from it
+_NOW_ANCHOR = None
+
+
+def _now_utc():
+    """Current UTC time: one wall-clock read per process, advanced by the monotonic clock."""
+    global _NOW_ANCHOR
+    if _NOW_ANCHOR is None:
+        _NOW_ANCHOR = (datetime.now(timezone.utc), time.monotonic())
+    wall, mono = _NOW_ANCHOR
+    return wall + timedelta(seconds=time.monotonic() - mono)
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_started_at(started_at):
+    """Parse an ISO 8601 started_at timestamp (trailing 'Z' allowed)."""
+    return datetime.fromisoformat(started_at.replace('Z', '+00:00'))
+
+
 # --- State file reading ---
 
+# A file modified this recently may be rewritten again within the filesystem's
+# timestamp granularity without its mtime changing; key those on content instead
+_RACY_MTIME_NS = 2_000_000_000
+
+
+def _content_key(path):
+    """Return an 8-byte BLAKE2b digest of the file's contents."""
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=8).digest()
+
+
+def _file_key(path, st):
+    """Memo key for a file: (mtime_ns, size), or (content digest,) if just modified."""
+    if time.time_ns() - st.st_mtime_ns < _RACY_MTIME_NS:
+        return (_content_key(path),)
+    return (st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=32)
+def _read_state_fields_keyed(state_file, *key):
+    try:
+        return read_frontmatter(state_file)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"auto-explorer: warning: failed to read state file {state_file}: {e}", file=sys.stderr)
+        return None
+
+
 def _read_state_fields(state_file):
     """Read and parse frontmatter from a state file.
 
     Returns parsed fields dict, or None on any error.
     Single read point to avoid redundant file I/O when multiple
-    functions need data from the same state file.
+    functions need data from the same state file; results are memoized
+    on (path, mtime, size), or on a content hash for just-modified files.
     """
     try:
-        with open(state_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        return parse_frontmatter(content)
+        key = _file_key(state_file, os.stat(state_file))
     except FileNotFoundError:
         return None
     except Exception as e:
         print(f"auto-explorer: warning: failed to read state file {state_file}: {e}", file=sys.stderr)
         return None
+    fields = _read_state_fields_keyed(str(state_file), *key)
+    return dict(fields) if fields is not None else None
 
 
 # --- Stale session detection ---
@@ -173,8 +322,8 @@ def check_stale_session(state_file, max_hours=24):
     if not started:
         return False
     try:
-        start = datetime.fromisoformat(started.replace('Z', '+00:00'))
-        hours = (datetime.now(timezone.utc) - start).total_seconds() / 3600
+        start = _parse_started_at(started)
+        hours = (_now_utc() - start).total_seconds() / 3600
         return hours > max_hours
     except Exception:
         return False
@@ -212,6 +361,9 @@ def get_stale_info(state_file, sep):
 
 # --- Topic suggestion ---
 
+_NUM_PREFIX_RE = re.compile(r'\d+\.\s*')
+
+
 def suggest_topic(interests_file):
     """Extract first numbered suggestion from user-interests.md.
 
@@ -228,19 +380,23 @@ def suggest_topics(interests_file, max_count=3):
     """
     results = []
     try:
+        # Stream lines so the rest of the file is never read once max_count is hit
         with open(interests_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        in_section = False
-        for line in content.split('\n'):
-            if 'Suggested Next Directions' in line:
-                in_section = True
-                continue
-            if in_section and re.match(r'^\d+\.', line.strip()):
-                suggestion = re.sub(r'^\d+\.\s*', '', line.strip())
-                if suggestion and 'No suggestions yet' not in suggestion:
-                    results.append(suggestion)
-                    if len(results) >= max_count:
-                        break
+            in_section = False
+            for line in f:
+                if 'Suggested Next Directions' in line:
+                    in_section = True
+                    continue
+                if not in_section:
+                    continue
+                stripped = line.strip()
+                m = _NUM_PREFIX_RE.match(stripped)
+                if m:
+                    suggestion = stripped[m.end():]
+                    if suggestion and 'No suggestions yet' not in suggestion:
+                        results.append(suggestion)
+                        if len(results) >= max_count:
+                            break
     except Exception:
         pass
     return results
@@ -254,8 +410,8 @@ def format_duration(started_at):
     Returns human-readable string like '2h 15m' or '30m'.
     """
     try:
-        start = datetime.fromisoformat(started_at.replace('Z', '+00:00'))
-        delta = datetime.now(timezone.utc) - start
+        start = _parse_started_at(started_at)
+        delta = _now_utc() - start
         mins = int(delta.total_seconds() // 60)
         if mins >= 60:
             return f'{mins // 60}h {mins % 60}m'
@@ -274,8 +430,12 @@ def format_rate_summary(rate_json, sep):
     try:
         data = json.loads(rate_json)
         allowed = 'yes' if data.get('allowed', True) else 'no'
+        # One pass over the windows builds both the exceeded lines and the summary
         detail_lines = []
+        parts = []
         for d in data.get('details', []):
+            if 'window' in d and 'pct' in d:
+                parts.append(f"{d['window']}:{d['pct']}%")
             if d.get('exceeded'):
                 w, pct = d['window'], d['pct']
                 used, limit = d['used'], d['limit']
@@ -284,11 +444,6 @@ def format_rate_summary(rate_json, sep):
                     f'  {w}: {used:,} / {limit:,} tokens ({pct}% >= {threshold*100:.0f}% threshold)'
                 )
         detail = '\n'.join(detail_lines)
-        parts = [
-            f"{d['window']}:{d['pct']}%"
-            for d in data.get('details', [])
-            if 'window' in d and 'pct' in d
-        ]
         summary = ' | '.join(parts) if parts else 'no limits configured'
         return f'{allowed}{sep}{detail}{sep}{summary}'
     except Exception:
@@ -349,6 +504,16 @@ def abbreviate_number(n):
 
 # --- Template loading ---
 
+@functools.lru_cache(maxsize=64)
+def _read_template_file(filepath, *key):
+    """Return (fields, stripped body) for a template file, memoized on (path, *_file_key)."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+    # Body is everything after the closing ---
+    fields, body = _split_frontmatter(content)
+    return fields, body.strip()
+
+
 def load_template(template_name, templates_dir):
     """Load an exploration template by name.
 
@@ -364,32 +529,17 @@ def load_template(template_name, templates_dir):
         os.path.join(templates_dir, template_name),
         os.path.join(templates_dir, template_name + '.md'),
     ]
-    filepath = None
     for c in candidates:
-        if os.path.isfile(c):
-            filepath = c
+        try:
+            st = os.stat(c)
+        except (OSError, ValueError):
+            continue
+        if stat.S_ISREG(st.st_mode):
             break
-    if filepath is None:
+    else:
         raise FileNotFoundError(f'Template not found: {template_name}')
 
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    fields = parse_frontmatter(content)
-
-    # Extract body (everything after the closing ---)
-    body = ''
-    lines = content.split('\n')
-    in_fm = False
-    body_start = 0
-    for i, line in enumerate(lines):
-        if line.strip() == '---':
-            if in_fm:
-                body_start = i + 1
-                break
-            in_fm = True
-    body = '\n'.join(lines[body_start:]).strip()
-
+    fields, body = _read_template_file(c, *_file_key(c, st))
     return {
         'name': fields.get('name', template_name),
         'description': fields.get('description', ''),
@@ -398,17 +548,41 @@ def load_template(template_name, templates_dir):
     }
 
 
+def _scan_template_names(templates_dir):
+    """Sorted template filenames in templates_dir."""
+    with os.scandir(templates_dir) as it:
+        return tuple(sorted(e.name for e in it
+                            if e.name.endswith('.md') and e.name != 'README.md' and e.is_file()))
+
+
+@functools.lru_cache(maxsize=8)
+def _template_names(templates_dir, mtime_ns):
+    """_scan_template_names memoized on the directory's mtime.
+
+    Adding, removing or renaming a file bumps the directory mtime; edits to a
+    template's contents are picked up by _read_template_file's own key.
+    """
+    return _scan_template_names(templates_dir)
+
+
 def list_templates(templates_dir):
     """List available templates in the templates directory.
 
     Returns list of dicts with keys: name, description, mode.
     """
     templates = []
-    if not os.path.isdir(templates_dir):
+    try:
+        st = os.stat(templates_dir)
+    except (OSError, ValueError):
         return templates
-    for fname in sorted(os.listdir(templates_dir)):
-        if not fname.endswith('.md') or fname == 'README.md':
-            continue
+    if not stat.S_ISDIR(st.st_mode):
+        return templates
+    # A directory has no content to hash, so a just-modified one is rescanned
+    if time.time_ns() - st.st_mtime_ns < _RACY_MTIME_NS:
+        names = _scan_template_names(templates_dir)
+    else:
+        names = _template_names(templates_dir, st.st_mtime_ns)
+    for fname in names:
         try:
             tpl = load_template(fname, templates_dir)
             templates.append({
@@ -423,43 +597,63 @@ def list_templates(templates_dir):
 
 # --- Session stats ---
 
-def get_session_stats(transcript_path, output_dir):
+# Transcript cursor sidecar shared with check-rate-limits.py, so whichever
+# script runs first in a hook tick does the scan and the other resumes from it
+TRANSCRIPT_CURSOR_FILE = os.path.join('.claude', 'auto-explorer-transcript-cursor.json')
+
+
+@functools.lru_cache(maxsize=1)
+def _rate_limits():
+    """Load check-rate-limits.py (same directory) on first use."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'check-rate-limits.py')
+    spec = importlib.util.spec_from_file_location('check_rate_limits', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def get_session_stats(transcript_path, output_dir, cursor_file=None):
     """Get session stats: estimated output tokens, files written, total output KB.
 
     Reads the transcript JSONL to count output_tokens, and scans the output
-    directory for file count and total size.
+    directory for file count and total size. With cursor_file, the token
+    count resumes from the incremental cursor kept by check-rate-limits.py,
+    so only lines appended since the last scan are read.
 
     Returns (tokens, files_written, total_kb) tuple.
     """
 
     tokens = 0
     if transcript_path and os.path.isfile(transcript_path):
-        try:
-            with open(transcript_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        entry = json.loads(line)
-                        usage = entry.get('usage', {})
-                        tokens += usage.get('output_tokens', 0)
-                    except json.JSONDecodeError:
-                        continue
-        except Exception as e:
-            print(f"auto-explorer: warning: failed to read transcript {transcript_path}: {e}", file=sys.stderr)
+        if cursor_file:
+            tokens = _rate_limits().get_session_tokens(transcript_path, cursor_file)
+        else:
+            try:
+                with open(transcript_path, 'rb') as f:
+                    for line in f:
+                        # Lines without the key cannot contribute; skip the parse
+                        if b'"output_tokens"' not in line:
+                            continue
+                        try:
+                            entry = json.loads(line)
+                            usage = entry.get('usage', {})
+                            tokens += usage.get('output_tokens', 0)
+                        except ValueError:
+                            continue
+            except Exception as e:
+                print(f"auto-explorer: warning: failed to read transcript {transcript_path}: {e}", file=sys.stderr)
 
     files_written = 0
     total_bytes = 0
     if output_dir and os.path.isdir(output_dir):
-        for name in os.listdir(output_dir):
-            fpath = os.path.join(output_dir, name)
-            if os.path.isfile(fpath):
-                files_written += 1
-                try:
-                    total_bytes += os.path.getsize(fpath)
-                except OSError:
-                    pass
+        with os.scandir(output_dir) as it:
+            for entry in it:
+                if entry.is_file():
+                    files_written += 1
+                    try:
+                        total_bytes += entry.stat().st_size
+                    except OSError:
+                        pass
 
     total_kb = round(total_bytes / 1024, 1)
     return tokens, files_written, total_kb
@@ -467,6 +661,13 @@ def get_session_stats(transcript_path, output_dir):
 
 # --- Telemetry ---
 
+def _utc_timestamp():
+    """Current UTC time as YYYY-MM-DDTHH:MM:SSZ, formatted from time.gmtime()."""
+    t = time.gmtime()
+    return (f'{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}'
+            f'T{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}Z')
+
+
 def append_telemetry(jsonl_path, slug, iteration, mode, tokens_est, output_kb, next_subtopic):
     """Append a per-iteration telemetry line to a JSONL file.
 
@@ -475,7 +676,7 @@ def append_telemetry(jsonl_path, slug, iteration, mode, tokens_est, output_kb, n
     line = {
         'slug': slug,
         'iteration': int(iteration),
-        'timestamp': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'timestamp': _utc_timestamp(),
         'mode': mode,
         'tokens_est': int(tokens_est),
         'output_kb': float(output_kb),
@@ -487,19 +688,18 @@ def append_telemetry(jsonl_path, slug, iteration, mode, tokens_est, output_kb, n
 
 # --- Quality signals ---
 
+def budget_iterations(threshold):
+    """Map a completion threshold to the expected iteration count for its budget."""
+    # conservative / aggressive / moderate
+    return 5 if threshold >= 0.75 else 20 if threshold <= 0.55 else 10
+
+
 def compute_quality_signals(iteration, threshold, output_kb):
     """Compute quality signals for session history.
 
     Returns (budget_iters, iter_ratio, output_density) tuple.
     """
-    # Map threshold to expected iteration count
-    if threshold >= 0.75:
-        budget_iters = 5
-    elif threshold <= 0.55:
-        budget_iters = 20
-    else:
-        budget_iters = 10
-
+    budget_iters = budget_iterations(threshold)
     iter_int = max(int(iteration), 1)
     iter_ratio = round(iter_int / max(budget_iters, 1), 2)
     output_density = round(float(output_kb) / iter_int, 1)
@@ -513,149 +713,187 @@ def extract_topic_words(topic, min_length=3):
 
     Returns JSON string of words with length >= min_length.
     """
-    words = [w.strip().lower() for w in topic.split() if len(w.strip()) >= min_length]
+    # split() already drops surrounding whitespace
+    words = [w.lower() for w in topic.split() if len(w) >= min_length]
+    # Printable ASCII without quotes or backslashes needs no escaping; the
+    # result is byte-identical to json.dumps
+    if all(w.isascii() and w.isprintable() and '"' not in w and '\\' not in w for w in words):
+        return '["' + '", "'.join(words) + '"]' if words else '[]'
     return json.dumps(words)
 
 
 # --- CLI interface ---
 
-def main():
-    if len(sys.argv) < 2:
-        print('Usage: helpers.py <command> [args...]', file=sys.stderr)
-        sys.exit(1)
+class _CommandError(Exception):
+    """A subcommand failed; the message goes to stderr and the exit status is 1."""
 
-    cmd = sys.argv[1]
 
+def _dispatch(cmd, args, read_stdin):
+    """Run one subcommand and return its stdout text (without trailing newline).
+
+    args are the arguments after the command name; read_stdin() returns the
+    command's stdin (str, or raw bytes from the CLI) and is only called by
+    commands that consume it. Every such command hands it straight to
+    json.loads, which accepts either.
+    Returns None for commands that print nothing.
+    """
     if cmd == 'parse-frontmatter':
-        filepath = sys.argv[2]
-        sep = sys.argv[3]
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-        fields = parse_frontmatter(content)
+        filepath = args[0]
+        sep = args[1]
         keys = ['iteration', 'max_iterations', 'threshold', 'topic',
                 'topic_slug', 'output_dir', 'mode', 'started_at']
-        print(sep.join(fields.get(k, '') for k in keys))
+        fields = read_frontmatter(filepath)
+        return sep.join(fields.get(k, '') for k in keys)
 
     elif cmd == 'make-slug-and-mode':
-        topic = sys.argv[2]
-        sep = sys.argv[3]
-        print(make_slug(topic) + sep + detect_mode(topic))
+        topic = args[0]
+        sep = args[1]
+        return make_slug(topic) + sep + detect_mode(topic)
 
     elif cmd == 'extract-tags':
-        sep = sys.argv[2]
+        sep = args[0]
         try:
-            line = sys.stdin.read().strip()
+            line = read_stdin().strip()
             data = json.loads(line)
             content = data.get('message', {}).get('content', [])
             text = '\n'.join(
                 item['text'] for item in content if item.get('type') == 'text'
             )
             done, next_t = extract_tags(text)
-            print(done + sep + next_t)
+            return done + sep + next_t
         except Exception:
-            print(sep)
+            return sep
 
     elif cmd == 'active-info':
-        print(get_active_info(sys.argv[2], sys.argv[3]))
+        return get_active_info(args[0], args[1])
 
     elif cmd == 'validate-limits':
-        print(validate_limits_config(sys.argv[2]))
+        return validate_limits_config(args[0])
 
     elif cmd == 'check-stale':
-        print('yes' if check_stale_session(sys.argv[2]) else 'no')
+        return 'yes' if check_stale_session(args[0]) else 'no'
 
     elif cmd == 'stale-info':
-        print(get_stale_info(sys.argv[2], sys.argv[3]))
+        return get_stale_info(args[0], args[1])
 
     elif cmd == 'suggest-topic':
-        print(suggest_topic(sys.argv[2]))
+        return suggest_topic(args[0])
 
     elif cmd == 'suggest-topics':
-        max_count = int(sys.argv[3]) if len(sys.argv) > 3 else 3
-        sep = sys.argv[4] if len(sys.argv) > 4 else '\n'
-        topics = suggest_topics(sys.argv[2], max_count=max_count)
-        print(sep.join(topics))
+        max_count = int(args[1]) if len(args) > 1 else 3
+        sep = args[2] if len(args) > 2 else '\n'
+        topics = suggest_topics(args[0], max_count=max_count)
+        return sep.join(topics)
 
     elif cmd == 'format-duration':
-        print(format_duration(sys.argv[2]))
+        return format_duration(args[0])
 
     elif cmd == 'format-rate-summary':
-        print(format_rate_summary(sys.stdin.read().strip(), sys.argv[2]))
+        return format_rate_summary(read_stdin().strip(), args[0])
 
     elif cmd == 'extract-json-field':
         try:
-            data = json.loads(sys.stdin.read())
-            print(data.get(sys.argv[2], ''))
+            data = json.loads(read_stdin())
+            return str(data.get(args[0], ''))
         except Exception:
-            print('')
+            return ''
 
     elif cmd == 'session-stats':
-        transcript_path = sys.argv[2] if len(sys.argv) > 2 else ''
-        output_dir = sys.argv[3] if len(sys.argv) > 3 else ''
-        sep = sys.argv[4] if len(sys.argv) > 4 else '\n'
-        tokens, files, kb = get_session_stats(transcript_path, output_dir)
-        print(f'{tokens}{sep}{files}{sep}{kb}')
+        transcript_path = args[0] if len(args) > 0 else ''
+        output_dir = args[1] if len(args) > 1 else ''
+        sep = args[2] if len(args) > 2 else '\n'
+        tokens, files, kb = get_session_stats(transcript_path, output_dir, TRANSCRIPT_CURSOR_FILE)
+        return f'{tokens}{sep}{files}{sep}{kb}'
 
     elif cmd == 'load-template':
-        template_name = sys.argv[2]
-        templates_dir = sys.argv[3]
-        sep = sys.argv[4] if len(sys.argv) > 4 else '\n'
+        template_name = args[0]
+        templates_dir = args[1]
+        sep = args[2] if len(args) > 2 else '\n'
         try:
             tpl = load_template(template_name, templates_dir)
-            # Output: name<sep>mode<sep>body
-            print(f"{tpl['name']}{sep}{tpl['mode']}{sep}{tpl['body']}")
         except FileNotFoundError as e:
-            print(str(e), file=sys.stderr)
-            sys.exit(1)
+            raise _CommandError(str(e))
+        # Output: name<sep>mode<sep>body
+        return f"{tpl['name']}{sep}{tpl['mode']}{sep}{tpl['body']}"
 
     elif cmd == 'list-templates':
-        templates_dir = sys.argv[2]
-        sep = sys.argv[3] if len(sys.argv) > 3 else '\n'
-        templates = list_templates(templates_dir)
-        for tpl in templates:
-            print(f"  {tpl['name']:20s} {tpl['description']}")
+        templates = list_templates(args[0])
+        if not templates:
+            return None
+        return '\n'.join(f"  {tpl['name']:20s} {tpl['description']}" for tpl in templates)
 
     elif cmd == 'budget-iterations':
-        threshold = float(sys.argv[2]) if len(sys.argv) > 2 else 0.6
-        if threshold >= 0.75:
-            print(5)    # conservative
-        elif threshold <= 0.55:
-            print(20)   # aggressive
-        else:
-            print(10)   # moderate
+        threshold = float(args[0]) if len(args) > 0 else 0.6
+        return str(budget_iterations(threshold))
 
     elif cmd == 'compute-quality-signals':
-        iteration = sys.argv[2] if len(sys.argv) > 2 else '1'
-        threshold = sys.argv[3] if len(sys.argv) > 3 else '0.6'
-        output_kb = sys.argv[4] if len(sys.argv) > 4 else '0'
-        sep = sys.argv[5] if len(sys.argv) > 5 else '\n'
+        iteration = args[0] if len(args) > 0 else '1'
+        threshold = args[1] if len(args) > 1 else '0.6'
+        output_kb = args[2] if len(args) > 2 else '0'
+        sep = args[3] if len(args) > 3 else '\n'
         budget_iters, iter_ratio, output_density = compute_quality_signals(
             iteration, float(threshold), output_kb
         )
-        print(f'{budget_iters}{sep}{iter_ratio}{sep}{output_density}')
+        return f'{budget_iters}{sep}{iter_ratio}{sep}{output_density}'
 
     elif cmd == 'extract-topic-words':
-        topic = sys.argv[2] if len(sys.argv) > 2 else ''
-        min_len = int(sys.argv[3]) if len(sys.argv) > 3 else 3
-        print(extract_topic_words(topic, min_len))
+        topic = args[0] if len(args) > 0 else ''
+        min_len = int(args[1]) if len(args) > 1 else 3
+        return extract_topic_words(topic, min_len)
 
     elif cmd == 'append-telemetry':
         # args: jsonl_path slug iteration mode tokens_est output_kb next_subtopic
-        if len(sys.argv) < 9:
-            print('Usage: append-telemetry <jsonl_path> <slug> <iteration> <mode> <tokens_est> <output_kb> <next_subtopic>', file=sys.stderr)
-            sys.exit(1)
-        append_telemetry(sys.argv[2], sys.argv[3], sys.argv[4], sys.argv[5], sys.argv[6], sys.argv[7], sys.argv[8])
+        if len(args) < 7:
+            raise _CommandError('Usage: append-telemetry <jsonl_path> <slug> <iteration> <mode> <tokens_est> <output_kb> <next_subtopic>')
+        append_telemetry(*args[:7])
+        return None
 
     elif cmd == 'json-output':
-        print(json.dumps({
-            'decision': 'block',
-            'reason': sys.argv[2],
-            'systemMessage': sys.argv[3],
-        }))
+        # Fixed schema: only the two strings need encoding. Same bytes as
+        # json.dumps of the dict (default separators, ASCII-escaped).
+        reason = json.dumps(args[0])
+        system_message = json.dumps(args[1])
+        return f'{{"decision": "block", "reason": {reason}, "systemMessage": {system_message}}}'
+
+    elif cmd == 'batch':
+        # stdin: JSON list of {"cmd": ..., "args": [...], "stdin": "..."}
+        try:
+            requests = json.loads(read_stdin())
+        except ValueError as e:
+            raise _CommandError(f'batch: invalid JSON on stdin: {e}')
+        if not isinstance(requests, list):
+            raise _CommandError('Usage: batch < JSON list of {"cmd": ..., "args": [...], "stdin": "..."}')
+        results = []
+        for req in requests:
+            if not isinstance(req, dict):
+                print(f"auto-explorer: warning: batch request {req!r} is not an object", file=sys.stderr)
+                results.append(None)
+                continue
+            req_stdin = req.get('stdin', '')
+            try:
+                results.append(_dispatch(req['cmd'], req.get('args', []), lambda: req_stdin))
+            except Exception as e:
+                print(f"auto-explorer: warning: batch command {req.get('cmd')} failed: {e}", file=sys.stderr)
+                results.append(None)
+        return json.dumps(results, ensure_ascii=False)
 
-    else:
-        print(f'Unknown command: {cmd}', file=sys.stderr)
+    raise _CommandError(f'Unknown command: {cmd}')
+
+
+def main():
+    if len(sys.argv) < 2:
+        print('Usage: helpers.py <command> [args...]', file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        # Raw bytes: json.loads detects UTF-8 itself, skipping the text layer
+        # and its locale-dependent decoding
+        out = _dispatch(sys.argv[1], sys.argv[2:], sys.stdin.buffer.read)
+    except _CommandError as e:
+        print(str(e), file=sys.stderr)
         sys.exit(1)
+    if out is not None:
+        print(out)
 
 
 if __name__ == '__main__':
@@ -12,14 +12,45 @@ Subcommands:
   show
 """
 
+import functools
 import importlib.util
 import json
+import os
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
 
 HISTORY_FILE = Path("auto-explore-findings/.history.json")
 
+# Dashboard rate-limit bars, indexed by the number of filled cells
+_BAR_LEN = 20
+_BARS = tuple("#" * i + "-" * (_BAR_LEN - i) for i in range(_BAR_LEN + 1))
+
+
+@functools.lru_cache(maxsize=1)
+def _helpers():
+    """Load helpers.py (same directory) once; None if it can't be loaded."""
+    try:
+        spec = importlib.util.spec_from_file_location(
+            "helpers", str(Path(__file__).parent / "helpers.py")
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def _rate_limits():
+    """Load check-rate-limits.py (same directory) once per process."""
+    spec = importlib.util.spec_from_file_location(
+        "check_rate_limits", str(Path(__file__).parent / "check-rate-limits.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
 
 def load_history():
     if not HISTORY_FILE.exists():
@@ -32,9 +63,21 @@ def load_history():
 
 
 def save_history(history):
+    """Write history atomically (temp file + os.replace), so readers never see a partial file."""
     HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(history, f, indent=2, ensure_ascii=False)
+    tmp = HISTORY_FILE.with_name(HISTORY_FILE.name + ".tmp")
+    # One write of the encoded text; json.dump would issue a write per token
+    payload = json.dumps(history, indent=2, ensure_ascii=False)
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(payload)
+    os.replace(tmp, HISTORY_FILE)
+
+
+def _now_iso_z():
+    """Current UTC time as YYYY-MM-DDTHH:MM:SSZ, formatted without strftime."""
+    d = datetime.now(timezone.utc)
+    return (f"{d.year:04d}-{d.month:02d}-{d.day:02d}"
+            f"T{d.hour:02d}:{d.minute:02d}:{d.second:02d}Z")
 
 
 def fix_stale_sessions(history):
@@ -47,7 +90,7 @@ def fix_stale_sessions(history):
     if state_file.exists():
         return False  # There's an active session, don't touch running entries
     dirty = False
-    now_str = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    now_str = _now_iso_z()
     for entry in history:
         if entry.get("status") == "running":
             entry["status"] = "error"
@@ -141,7 +184,7 @@ def end_session(slug, iterations, status, reason="",
     cmd_end() is the CLI wrapper that parses positional args.
     """
     history = load_history()
-    now_str = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    now_str = _now_iso_z()
 
     for entry in reversed(history):
         if entry.get("slug") == slug and entry.get("status") == "running":
@@ -162,10 +205,9 @@ def end_session(slug, iterations, status, reason="",
                     entry["quality_signals"]["output_density"] = output_density
             if keywords:
                 entry["keywords"] = keywords
+            save_history(history)
             break
 
-    save_history(history)
-
 
 def cmd_end(args):
     """CLI wrapper for end_session() — parses positional args.
@@ -231,11 +273,18 @@ def cmd_resume(args):
     ]))
 
 
-def format_duration(started_str, ended_str=None):
-    """Format duration between two ISO timestamps."""
+def format_duration(started_str, ended_str=None, now=None):
+    """Format duration between two ISO timestamps.
+
+    Without ended_str the duration runs to now; callers formatting many
+    entries pass one precomputed now instead of reading the clock per entry.
+    """
     try:
         start = datetime.fromisoformat(started_str.replace("Z", "+00:00"))
-        end = datetime.fromisoformat(ended_str.replace("Z", "+00:00")) if ended_str else datetime.now(timezone.utc)
+        if ended_str:
+            end = datetime.fromisoformat(ended_str.replace("Z", "+00:00"))
+        else:
+            end = now or datetime.now(timezone.utc)
         delta = end - start
         total_mins = int(delta.total_seconds() // 60)
         hours = total_mins // 60
@@ -265,80 +314,55 @@ def cmd_show():
     history = load_history()
     state_file = Path(".claude/auto-explorer.local.md")
 
-    # Import helpers module (abbreviate_number, parse_frontmatter)
-    abbrev = str  # fallback: just convert to string
-    parse_fm = None
-    try:
-        script_dir = Path(__file__).parent
-        helpers_spec = importlib.util.spec_from_file_location(
-            "helpers", str(script_dir / "helpers.py")
-        )
-        helpers_mod = importlib.util.module_from_spec(helpers_spec)
-        helpers_spec.loader.exec_module(helpers_mod)
-        abbrev = helpers_mod.abbreviate_number
-        parse_fm = helpers_mod.parse_frontmatter
-    except Exception:
-        pass
+    # Helpers module (abbreviate_number, state file frontmatter reader)
+    helpers_mod = _helpers()
+    abbrev = helpers_mod.abbreviate_number if helpers_mod else str
 
-    # Check for active session
+    # Check for active session (parsed by helpers' cached frontmatter reader)
     active = None
     if state_file.exists():
         try:
-            content = state_file.read_text(encoding="utf-8")
-            if parse_fm:
-                active = parse_fm(content)
-            else:
-                # Inline fallback if helpers import failed
-                in_fm = False
-                fields = {}
-                for line in content.split("\n"):
-                    if line.strip() == "---":
-                        if in_fm:
-                            break
-                        in_fm = True
-                        continue
-                    if in_fm and ":" in line:
-                        k, v = line.split(":", 1)
-                        fields[k.strip()] = v.strip().strip('"')
-                active = fields
+            if helpers_mod is None:
+                raise ImportError("helpers.py could not be loaded")
+            active = helpers_mod._read_state_fields(str(state_file))
         except Exception as e:
             print(f"auto-explorer: warning: failed to read active session: {e}", file=sys.stderr)
 
     now = datetime.now(timezone.utc)
-    today_str = now.strftime("%Y-%m-%d")
+    today_str = now.date().isoformat()
+
+    # Collect the dashboard and write it to stdout in one call
+    out = []
+
+    def emit(line=""):
+        out.append(f"{line}\n")
 
-    print("=" * 62)
-    print("  Auto-Explorer Dashboard")
-    print("=" * 62)
+    emit("=" * 62)
+    emit("  Auto-Explorer Dashboard")
+    emit("=" * 62)
 
     # Active session
-    print()
+    emit()
     if active:
         topic = active.get("topic", "?")
         mode = active.get("mode", "?")
         iteration = active.get("iteration", "?")
         started = active.get("started_at", "")
         threshold = active.get("threshold", "0.6")
-        duration = format_duration(started) if started else "?"
+        duration = format_duration(started, now=now) if started else "?"
 
-        print(f"  >> ACTIVE SESSION")
-        print(f"     Topic:     {topic}")
-        print(f"     Mode:      {mode}")
-        print(f"     Iteration: {iteration}")
-        print(f"     Running:   {duration}")
-        print(f"     Budget:    stops at {float(threshold)*100:.0f}%")
+        emit(f"  >> ACTIVE SESSION")
+        emit(f"     Topic:     {topic}")
+        emit(f"     Mode:      {mode}")
+        emit(f"     Iteration: {iteration}")
+        emit(f"     Running:   {duration}")
+        emit(f"     Budget:    stops at {float(threshold)*100:.0f}%")
 
         # Show rate limit usage if check-rate-limits.py is available
         try:
-            spec = importlib.util.spec_from_file_location(
-                "check_rate_limits", str(script_dir / "check-rate-limits.py")
-            )
-            crl = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(crl)
-
-            result = crl.check_limits(threshold_override=float(threshold))
+            result = _rate_limits().check_limits(threshold_override=float(threshold))
             details = result.get("details", [])
-            threshold_frac = float(threshold)
+            threshold_pos = min(int(float(threshold) * _BAR_LEN), _BAR_LEN)
             usage_parts = []
             for d in details:
                 if "window" in d and "pct" in d:
@@ -346,32 +370,23 @@ def cmd_show():
                     window = d["window"]
                     limit = d.get("limit", 0)
                     used = d.get("used", 0)
-                    bar_len = 20
-                    filled = min(int(pct / 100 * bar_len), bar_len)
+                    bar = _BARS[max(0, min(int(pct / 100 * _BAR_LEN), _BAR_LEN))]
                     # Place threshold marker on the bar
-                    threshold_pos = min(int(threshold_frac * bar_len), bar_len)
-                    bar_chars = []
-                    for i in range(bar_len):
-                        if i == threshold_pos:
-                            bar_chars.append("|")
-                        elif i < filled:
-                            bar_chars.append("#")
-                        else:
-                            bar_chars.append("-")
-                    bar = "".join(bar_chars)
+                    if 0 <= threshold_pos < _BAR_LEN:
+                        bar = f"{bar[:threshold_pos]}|{bar[threshold_pos + 1:]}"
                     exceeded = d.get("exceeded", False)
                     marker = " EXCEEDED" if exceeded else ""
                     usage_parts.append(f"     {window:>6}: [{bar}] {pct:5.1f}%  ({abbrev(used)} / {abbrev(limit)}){marker}")
             if usage_parts:
-                print(f"     --- Rate Limits (| = stop threshold) ---")
+                emit(f"     --- Rate Limits (| = stop threshold) ---")
                 for line in usage_parts:
-                    print(line)
+                    emit(line)
         except Exception:
             pass  # Don't crash dashboard if rate limit check fails
 
     else:
-        print("  No active session.")
-        print("  Start one: /auto-explore <topic>")
+        emit("  No active session.")
+        emit("  Start one: /auto-explore <topic>")
 
     # Auto-fix stale "running" entries (session ended without proper history update)
     if fix_stale_sessions(history):
@@ -379,85 +394,104 @@ def cmd_show():
 
     # Session history
     if not history:
-        print()
-        print("  No session history yet.")
-        print("=" * 62)
+        emit()
+        emit("  No session history yet.")
+        emit("=" * 62)
+        sys.stdout.write("".join(out))
         return
 
-    # Split into today vs older
+    # One pass: split today vs older, count statuses, and sum lifetime stats.
+    # Iterates oldest-first (keeping the float sum order) and reverses the
+    # buckets afterwards so both list the newest session first.
     today_sessions = []
     older_sessions = []
-    for entry in reversed(history):
+    running = completed = rate_limited = cancelled = 0
+    total_tokens = total_files = total_kb = total_iters = 0
+    for entry in history:
         started = entry.get("started_at", "")
         if started[:10] == today_str:
             today_sessions.append(entry)
         else:
             older_sessions.append(entry)
+        status = entry.get("status")
+        if status == "running":
+            running += 1
+        elif status in ("completed", "max-iterations"):
+            completed += 1
+        elif status == "rate-limited":
+            rate_limited += 1
+        elif status == "cancelled":
+            cancelled += 1
+        total_tokens += entry.get("estimated_tokens", 0)
+        total_files += entry.get("files_written", 0)
+        total_kb += entry.get("total_output_kb", 0)
+        iterations = entry.get("iterations")
+        if isinstance(iterations, int):
+            total_iters += iterations
+    today_sessions.reverse()
+    older_sessions.reverse()
 
     def format_entry(entry, show_date=False):
-        topic = entry.get("topic", "?")
-        mode = entry.get("mode", "?")
-        iters = entry.get("iterations", "?")
-        status = entry.get("status", "?")
-        reason = entry.get("reason", "")
-        started = entry.get("started_at", "")
-        ended = entry.get("ended_at", "")
-        output_dir = entry.get("output_dir", "")
-        tokens = entry.get("estimated_tokens", 0)
+        g = entry.get
+        topic = g("topic", "?")
+        mode = g("mode", "?")
+        iters = g("iterations", "?")
+        status = g("status", "?")
+        started = g("started_at", "")
         icon = status_icon(status)
-        duration = format_duration(started, ended) if started else "?"
+        duration = format_duration(started, g("ended_at", ""), now) if started else "?"
 
-        time_part = started[11:16] if len(started) >= 16 else "?"
-        if show_date:
-            time_part = started[:16].replace("T", " ") if len(started) >= 16 else "?"
+        if len(started) < 16:
+            time_part = "?"
+        elif show_date:
+            time_part = started[:16].replace("T", " ")
+        else:
+            time_part = started[11:16]
 
         lines = [f"  [{icon}] {time_part}  {duration:>6}  {mode:<8}  {iters:>3} iters  {topic}"]
-        if reason and status != "running":
-            lines.append(f"       Result: {reason}")
-        if output_dir and status != "running":
-            lines.append(f"       Output: {output_dir}/")
-        if tokens > 0 and status != "running":
-            lines.append(f"       Tokens: ~{abbrev(tokens)} output")
+        # Detail lines are only shown for finished sessions
+        if status != "running":
+            reason = g("reason", "")
+            if reason:
+                lines.append(f"       Result: {reason}")
+            output_dir = g("output_dir", "")
+            if output_dir:
+                lines.append(f"       Output: {output_dir}/")
+            tokens = g("estimated_tokens", 0)
+            if tokens > 0:
+                lines.append(f"       Tokens: ~{abbrev(tokens)} output")
         return "\n".join(lines)
 
     if today_sessions:
-        print()
-        print(f"  --- Today ({today_str}) ---")
+        emit()
+        emit(f"  --- Today ({today_str}) ---")
         for entry in today_sessions:
-            print(format_entry(entry))
+            emit(format_entry(entry))
 
     if older_sessions:
-        print()
-        print(f"  --- Earlier ---")
+        emit()
+        emit(f"  --- Earlier ---")
         for entry in older_sessions[:10]:
-            print(format_entry(entry, show_date=True))
+            emit(format_entry(entry, show_date=True))
         if len(older_sessions) > 10:
-            print(f"  ... and {len(older_sessions) - 10} more")
+            emit(f"  ... and {len(older_sessions) - 10} more")
 
     # Summary stats
     total = len(history)
-    running = sum(1 for e in history if e.get("status") == "running")
-    completed = sum(1 for e in history if e.get("status") in ("completed", "max-iterations"))
-    rate_limited = sum(1 for e in history if e.get("status") == "rate-limited")
-    cancelled = sum(1 for e in history if e.get("status") == "cancelled")
 
     # Lifetime stats (token tracking from E-block)
-    total_tokens = sum(e.get("estimated_tokens", 0) for e in history)
-    total_files = sum(e.get("files_written", 0) for e in history)
-    total_kb = sum(e.get("total_output_kb", 0) for e in history)
-    total_iters = sum(e.get("iterations", 0) for e in history if isinstance(e.get("iterations"), int))
-
     if total_tokens > 0 or total_files > 0:
-        print()
-        print(f"  --- Lifetime Stats ---")
-        print(f"  Sessions: {total} | Iterations: {total_iters} | Est. tokens: ~{abbrev(total_tokens)} output | Files: {total_files} | Output: {total_kb:.1f} KB")
-
-    print()
-    print(f"  --- Legend ---")
-    print(f"  [>>] running  [OK] completed  [$$] rate-limited  [--] cancelled  [##] max-iters  [->] resumed  [!!] error")
-    print()
-    print(f"  Total: {total} sessions | Completed: {completed} | Rate-limited: {rate_limited} | Cancelled: {cancelled}")
-    print("=" * 62)
+        emit()
+        emit(f"  --- Lifetime Stats ---")
+        emit(f"  Sessions: {total} | Iterations: {total_iters} | Est. tokens: ~{abbrev(total_tokens)} output | Files: {total_files} | Output: {total_kb:.1f} KB")
+
+    emit()
+    emit(f"  --- Legend ---")
+    emit(f"  [>>] running  [OK] completed  [$$] rate-limited  [--] cancelled  [##] max-iters  [->] resumed  [!!] error")
+    emit()
+    emit(f"  Total: {total} sessions | Completed: {completed} | Rate-limited: {rate_limited} | Cancelled: {cancelled}")
+    emit("=" * 62)
+    sys.stdout.write("".join(out))
 
 
 if __name__ == "__main__":
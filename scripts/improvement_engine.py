@@ -10,34 +10,81 @@ CLI subcommands:
   suggest-budget <mode>             Learn preferred budget from history
   template-stats                    Show per-template performance stats
   detect-repeat <keywords_json>     Check if topic overlaps with past session
+  setup-hints <mode> <keywords_json> <sep> [want_template]
+                                    Template, budget and repeat hints joined by sep
+                                    (one history parse; template skipped if want_template is 0)
   extract-keywords <output_dir> [n] Extract keywords from output files via TF-IDF
   mode-accuracy                     Show mode auto-detection accuracy
 """
 
+import functools
+import heapq
 import json
 import math
+import os
 import random
 import re
 import sys
-from collections import Counter, defaultdict
+from collections import Counter
+from itertools import chain
+from operator import itemgetter
 from pathlib import Path
 
 HISTORY_FILE = Path("auto-explore-findings/.history.json")
 
+# TF-IDF tokenizer and the stop words dropped from its results
+_WORD_RE = re.compile(r"[a-z][a-z0-9-]{2,}")
+_STOPS = frozenset({
+    "the", "and", "for", "with", "from", "that", "this", "are", "was",
+    "will", "can", "has", "have", "been", "not", "but", "also", "its",
+    "each", "how", "use", "used", "using", "all", "into", "when", "which",
+    "more", "than", "other", "about", "would", "could", "should", "there",
+    "what", "where", "why", "these", "those", "does", "you", "your",
+    "they", "their", "them", "then", "some", "such", "most", "any",
+})
 
-def load_completed_sessions():
-    """Load sessions with usable quality signals."""
-    if not HISTORY_FILE.exists():
-        return []
+
+@functools.lru_cache(maxsize=4)
+def _load_completed_keyed(path, mtime_ns, size, ino):
+    """Parse and filter one version of the history file (cached per stat key).
+
+    Returns (sessions, keyword_sets): two parallel tuples, the second holding
+    each session's keywords as a frozenset for similarity checks.
+    """
     try:
-        with open(HISTORY_FILE, "r", encoding="utf-8") as f:
+        with open(path, "r", encoding="utf-8") as f:
             history = json.load(f)
     except (json.JSONDecodeError, FileNotFoundError):
-        return []
-    return [
+        return (), ()
+    sessions = tuple(
         s for s in history
         if s.get("status") in ("completed", "rate-limited", "max-iterations")
-    ]
+    )
+    return sessions, tuple(frozenset(s.get("keywords", ())) for s in sessions)
+
+
+def _load_completed():
+    """(sessions, keyword_sets) for the current history file.
+
+    Session dicts are fresh copies on every call; their nested lists are
+    still shared with the cache, so don't mutate those in place.
+    """
+    path = os.path.abspath(HISTORY_FILE)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return [], ()
+    sessions, keyword_sets = _load_completed_keyed(path, st.st_mtime_ns, st.st_size, st.st_ino)
+    return [dict(s) for s in sessions], keyword_sets
+
+
+def load_completed_sessions():
+    """Load sessions with usable quality signals.
+
+    The parse is cached on the history file's (path, mtime_ns, size, inode),
+    so repeated calls skip json.load until history.py replaces the file.
+    """
+    return _load_completed()[0]
 
 
 def template_stats(sessions):
@@ -46,43 +93,65 @@ def template_stats(sessions):
     Returns dict: template_name -> {count, avg_iterations,
     natural_completion_rate, avg_output_density, bandit}
     """
-    stats = defaultdict(lambda: {
-        "count": 0, "total_iters": 0, "natural": 0,
-        "total_density": 0.0, "bandit": {"alpha": 1, "beta": 1},
-    })
+    # Plain dict of running sums; the Beta(alpha, beta) state follows from them
+    # (alpha = 1 + natural, beta = 1 + count - natural)
+    stats = {}
     for s in sessions:
         t = s.get("template") or "_none"
-        stats[t]["count"] += 1
-        stats[t]["total_iters"] += s.get("iterations", 0)
+        d = stats.get(t)
+        if d is None:
+            d = stats[t] = {"count": 0, "total_iters": 0, "natural": 0, "total_density": 0.0}
         qs = s.get("quality_signals", {})
-        if qs.get("completion_type") == "natural":
-            stats[t]["natural"] += 1
-            stats[t]["bandit"]["alpha"] += 1
-        else:
-            stats[t]["bandit"]["beta"] += 1
-        stats[t]["total_density"] += qs.get("output_density", 0)
+        qs_get = qs.get
+        d["count"] += 1
+        d["total_iters"] += s.get("iterations", 0)
+        if qs_get("completion_type") == "natural":
+            d["natural"] += 1
+        d["total_density"] += qs_get("output_density", 0)
 
     result = {}
     for t, d in stats.items():
         n = d["count"]
+        natural = d["natural"]
         result[t] = {
             "count": n,
-            "avg_iterations": round(d["total_iters"] / n, 1) if n else 0,
-            "natural_completion_rate": round(d["natural"] / n, 2) if n else 0,
-            "avg_output_density": round(d["total_density"] / n, 1) if n else 0,
-            "bandit": d["bandit"],
+            "avg_iterations": round(d["total_iters"] / n, 1),
+            "natural_completion_rate": round(natural / n, 2),
+            "avg_output_density": round(d["total_density"] / n, 1),
+            "bandit": {"alpha": 1 + natural, "beta": 1 + n - natural},
         }
     return result
 
 
+def _bandit_params(sessions):
+    """Per-template Beta(alpha, beta) state as flat (alpha, beta) tuples.
+
+    Same values as template_stats()[t]["bandit"], without the averages.
+    """
+    counts = {}
+    natural = {}
+    for s in sessions:
+        t = s.get("template") or "_none"
+        counts[t] = counts.get(t, 0) + 1
+        if s.get("quality_signals", {}).get("completion_type") == "natural":
+            natural[t] = natural.get(t, 0) + 1
+    params = {}
+    for t, n in counts.items():
+        wins = natural.get(t, 0)
+        params[t] = (1 + wins, 1 + n - wins)
+    return params
+
+
 def suggest_template(sessions, available_templates, mode=None, seed=None):
     """Thompson Sampling over templates: pick template most likely to succeed.
 
     'Success' = natural completion. Each template has Beta(alpha, beta) prior.
     Returns (template_name, score) tuple.
     """
-    rng = random.Random(seed)
-    stats = template_stats(sessions)
+    # betavariate draws Gamma(alpha) / (Gamma(alpha) + Gamma(beta)) from the
+    # same stream, so seeded picks are unchanged
+    betavariate = random.Random(seed).betavariate
+    params = _bandit_params(sessions)
 
     if not available_templates:
         return None, 0.0
@@ -91,12 +160,8 @@ def suggest_template(sessions, available_templates, mode=None, seed=None):
     best_template = available_templates[0]
 
     for t in available_templates:
-        s = stats.get(t, {"bandit": {"alpha": 1, "beta": 1}})
-        alpha = s["bandit"]["alpha"]
-        beta_param = s["bandit"]["beta"]
-        x = rng.gammavariate(max(alpha, 0.1), 1)
-        y = rng.gammavariate(max(beta_param, 0.1), 1)
-        score = x / (x + y) if (x + y) > 0 else 0.5
+        alpha, beta_param = params.get(t, (1, 1))
+        score = betavariate(max(alpha, 0.1), max(beta_param, 0.1))
         if score > best_score:
             best_score = score
             best_template = t
@@ -108,17 +173,25 @@ def suggest_budget(sessions, mode):
 
     Returns "aggressive", "conservative", or None (keep current).
     """
-    mode_sessions = [s for s in sessions if s.get("mode") == mode]
-    if len(mode_sessions) < 3:
-        return None
-
-    qs_list = [s.get("quality_signals", {}) for s in mode_sessions[-10:]]
-    ratios = [q.get("iterations_vs_budget", 0) for q in qs_list if q and q.get("iterations_vs_budget")]
-
-    if not ratios:
+    # Walk newest-first and stop after the 10 most recent sessions in this mode
+    count = 0
+    ratios = []
+    for s in reversed(sessions):
+        if s.get("mode") != mode:
+            continue
+        qs = s.get("quality_signals")
+        if qs:
+            ratio = qs.get("iterations_vs_budget")
+            if ratio:
+                ratios.append(ratio)
+        count += 1
+        if count == 10:
+            break
+    if count < 3 or not ratios:
         return None
 
-    avg_ratio = sum(ratios) / len(ratios)
+    # Sum oldest-first, matching the order the ratios were recorded in
+    avg_ratio = sum(reversed(ratios)) / len(ratios)
     if avg_ratio > 0.95:
         return "aggressive"
     elif avg_ratio < 0.4:
@@ -145,10 +218,7 @@ def frequent_keywords(sessions, top_n=20):
 
     Returns list of (keyword, count) tuples.
     """
-    counter = Counter()
-    for s in sessions[-50:]:
-        for kw in s.get("keywords", []):
-            counter[kw] += 1
+    counter = Counter(chain.from_iterable(s.get("keywords", ()) for s in sessions[-50:]))
     return counter.most_common(top_n)
 
 
@@ -158,25 +228,40 @@ def session_similarity(session_a, session_b):
     kw_b = set(session_b.get("keywords", []))
     if not kw_a or not kw_b:
         return 0.0
-    return len(kw_a & kw_b) / len(kw_a | kw_b)
+    # |A ∪ B| = |A| + |B| - |A ∩ B|, so no union set is built
+    inter = len(kw_a & kw_b)
+    return inter / (len(kw_a) + len(kw_b) - inter)
 
 
-def detect_repeat_topic(sessions, new_topic_keywords, threshold=0.5):
+def detect_repeat_topic(sessions, new_topic_keywords, threshold=0.5, keyword_sets=None):
     """Check if a new topic overlaps significantly with a past session.
 
+    keyword_sets: optional per-session keyword sets, parallel to sessions
+    (as returned by _load_completed); built on the fly when omitted.
     Returns the matching session dict or None.
     """
     new_set = set(new_topic_keywords)
     if not new_set:
         return None
-    for s in reversed(sessions):
-        kw_set = set(s.get("keywords", []))
-        if not kw_set:
-            continue
-        union = new_set | kw_set
-        if not union:
+    new_len = len(new_set)
+    # Jaccard(A, B) <= min(|A|, |B|) / max(|A|, |B|), so a session whose keyword
+    # count falls outside [threshold * |A|, |A| / threshold] cannot match. The
+    # bounds are widened by one to stay safe under float rounding.
+    if threshold > 0:
+        lo = math.ceil(threshold * new_len) - 1
+        hi = math.floor(new_len / threshold) + 1
+    else:
+        lo, hi = 0, math.inf
+    for i in range(len(sessions) - 1, -1, -1):
+        s = sessions[i]
+        if keyword_sets is not None:
+            kw_set = keyword_sets[i]
+        else:
+            kw_set = frozenset(s.get("keywords", ()))
+        if not kw_set or not lo <= len(kw_set) <= hi:
             continue
-        sim = len(new_set & kw_set) / len(union)
+        inter = len(new_set & kw_set)
+        sim = inter / (new_len + len(kw_set) - inter)
         if sim >= threshold:
             return s
     return None
@@ -187,55 +272,82 @@ def extract_keywords_tfidf(output_dir, top_n=10):
 
     Zero external dependencies.
     """
-    output_path = Path(output_dir)
-    if not output_path.is_dir():
+    # scandir + sort on names: no Path objects or per-entry stat calls
+    try:
+        with os.scandir(output_dir) as it:
+            files = sorted(
+                entry.path for entry in it
+                if os.path.normcase(entry.name).endswith(".md") and entry.is_file()
+            )
+    except OSError:
         return []
 
-    docs = []
-    for f in sorted(output_path.glob("*.md")):
+    # idf depends only on the word, so the per-document sum of count * idf
+    # equals total count * idf: one log per vocabulary word, not per (doc, word).
+    # Term and document frequencies are both counted straight from each file's
+    # tokens (C-level Counter updates), with no per-document Counter.
+    tf = Counter()
+    df = Counter()
+    n_docs = 0
+    for path in files:
         try:
-            text = f.read_text(encoding="utf-8").lower()
-            words = re.findall(r"[a-z][a-z0-9-]{2,}", text)
-            docs.append(Counter(words))
-        except Exception:
+            with open(path, "rb") as f:
+                text = f.read().decode("utf-8").lower()
+        except (OSError, UnicodeDecodeError):
             continue
+        words = _WORD_RE.findall(text)
+        tf.update(words)
+        df.update(set(words))
+        n_docs += 1
 
-    if not docs:
+    if not n_docs:
         return []
 
-    df = Counter()
-    for doc in docs:
-        for word in doc:
-            df[word] += 1
-
-    n_docs = len(docs)
-    combined = Counter()
-    for doc in docs:
-        for word, count in doc.items():
-            idf = math.log(n_docs / df[word]) + 1
-            combined[word] += count * idf
-
-    stops = {
-        "the", "and", "for", "with", "from", "that", "this", "are", "was",
-        "will", "can", "has", "have", "been", "not", "but", "also", "its",
-        "each", "how", "use", "used", "using", "all", "into", "when", "which",
-        "more", "than", "other", "about", "would", "could", "should", "there",
-        "what", "where", "why", "these", "those", "does", "you", "your",
-        "they", "their", "them", "then", "some", "such", "most", "any",
-    }
+    log = math.log
+    scored = (
+        (word, count * (log(n_docs / df[word]) + 1))
+        for word, count in tf.items()
+        if word not in _STOPS
+    )
+    # Stop words are dropped before ranking, so exactly top_n survive
     return [
         (w, round(s, 1))
-        for w, s in combined.most_common(top_n * 2)
-        if w not in stops
-    ][:top_n]
+        for w, s in heapq.nlargest(top_n, scored, key=itemgetter(1))
+    ]
 
 
 # --- CLI ---
 
+TEMPLATES = ["deep-dive", "quickstart", "architecture-review", "security-audit", "comparison", "dual-lens"]
+
+
+def _template_hint(sessions, mode):
+    """suggest-template output: the pick with its track record, or ''."""
+    tpl, score = suggest_template(sessions, TEMPLATES, mode=mode)
+    if not tpl:
+        return ""
+    s = template_stats(sessions).get(tpl, {})
+    rate = s.get("natural_completion_rate", 0)
+    count = s.get("count", 0)
+    if count > 0:
+        return f"{tpl} ({rate*100:.0f}% success, {count} sessions)"
+    return tpl
+
+
+def _repeat_hint(sessions, keywords, keyword_sets=None):
+    """detect-repeat output: the overlapping past session, or ''."""
+    match = detect_repeat_topic(sessions, keywords, keyword_sets=keyword_sets)
+    if match:
+        slug = match.get("slug", "?")
+        topic = match.get("topic", "?")
+        return f"Similar to: {topic} ({slug})"
+    return ""
+
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print(
-            "Usage: improvement_engine.py <suggest-template|suggest-budget|template-stats|detect-repeat|extract-keywords|mode-accuracy> [args...]",
+            "Usage: improvement_engine.py <suggest-template|suggest-budget|template-stats|detect-repeat|setup-hints|extract-keywords|mode-accuracy> [args...]",
             file=sys.stderr,
         )
         sys.exit(1)
@@ -244,20 +356,7 @@ if __name__ == "__main__":
 
     if cmd == "suggest-template":
         mode = sys.argv[2] if len(sys.argv) > 2 else "research"
-        sessions = load_completed_sessions()
-        templates = ["deep-dive", "quickstart", "architecture-review", "security-audit", "comparison", "dual-lens"]
-        tpl, score = suggest_template(sessions, templates, mode=mode)
-        if tpl:
-            stats = template_stats(sessions)
-            s = stats.get(tpl, {})
-            rate = s.get("natural_completion_rate", 0)
-            count = s.get("count", 0)
-            if count > 0:
-                print(f"{tpl} ({rate*100:.0f}% success, {count} sessions)")
-            else:
-                print(tpl)
-        else:
-            print("")
+        print(_template_hint(load_completed_sessions(), mode))
 
     elif cmd == "suggest-budget":
         mode = sys.argv[2] if len(sys.argv) > 2 else "research"
@@ -279,15 +378,27 @@ if __name__ == "__main__":
         if len(sys.argv) < 3:
             print("Usage: improvement_engine.py detect-repeat <keywords_json>", file=sys.stderr)
             sys.exit(1)
-        sessions = load_completed_sessions()
+        sessions, keyword_sets = _load_completed()
         keywords = json.loads(sys.argv[2])
-        match = detect_repeat_topic(sessions, keywords)
-        if match:
-            slug = match.get("slug", "?")
-            topic = match.get("topic", "?")
-            print(f"Similar to: {topic} ({slug})")
-        else:
-            print("")
+        print(_repeat_hint(sessions, keywords, keyword_sets))
+
+    elif cmd == "setup-hints":
+        if len(sys.argv) < 5:
+            print("Usage: improvement_engine.py setup-hints <mode> <keywords_json> <sep> [want_template]", file=sys.stderr)
+            sys.exit(1)
+        mode, keywords_json, sep = sys.argv[2:5]
+        want_template = sys.argv[5] != "0" if len(sys.argv) > 5 else True
+        # One history parse serves all three hints
+        sessions, keyword_sets = _load_completed()
+        try:
+            keywords = json.loads(keywords_json)
+        except json.JSONDecodeError:
+            keywords = []
+        print(sep.join((
+            _template_hint(sessions, mode) if want_template else "",
+            suggest_budget(sessions, mode) or "",
+            _repeat_hint(sessions, keywords, keyword_sets),
+        )))
 
     elif cmd == "extract-keywords":
         output_dir = sys.argv[2] if len(sys.argv) > 2 else ""
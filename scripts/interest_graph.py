@@ -18,19 +18,27 @@ CLI subcommands:
   update-bandit <id> <engaged>      Update bandit feedback (true/false)
 """
 
+import functools
+import heapq
 import json
 import math
+import os
 import random
 import re
 import sys
 from collections import Counter
 from datetime import datetime, timezone
 from itertools import combinations
+from operator import itemgetter
 from pathlib import Path
 
 GRAPH_FILE = Path.home() / ".claude" / "interest-graph.json"
 MD_FILE = Path.home() / ".claude" / "user-interests.md"
 
+# user-interests.md line patterns used by migrate_from_markdown
+_CAT_RE = re.compile(r"^## (.+)")
+_KW_RE = re.compile(r"^- \*\*keywords\*\*: \[(.+)\]")
+
 
 def load_graph():
     """Load interest graph from disk. Auto-migrates from MD on first call."""
@@ -45,6 +53,17 @@ def load_graph():
         return _empty_graph()
 
 
+def _today():
+    """Current UTC date as YYYY-MM-DD (not cached, so long-lived callers never go stale)."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_day(day_str):
+    """Parse a YYYY-MM-DD lastSeen string; cached, as many concepts share a day."""
+    return datetime.strptime(day_str, "%Y-%m-%d").date()
+
+
 def _empty_graph():
     return {
         "version": 1,
@@ -54,22 +73,27 @@ def _empty_graph():
     }
 
 
-def save_graph(graph):
-    """Write interest graph to disk."""
-    graph["meta"]["lastUpdated"] = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+def save_graph(graph, today=None):
+    """Write interest graph atomically (temp file + os.replace), so a crash never leaves it half-written."""
+    graph["meta"]["lastUpdated"] = today or _today()
     GRAPH_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(GRAPH_FILE, "w", encoding="utf-8") as f:
-        json.dump(graph, f, indent=2, ensure_ascii=False)
+    tmp = GRAPH_FILE.with_name(GRAPH_FILE.name + ".tmp")
+    # One write of the encoded text; json.dump would issue a write per token
+    payload = json.dumps(graph, indent=2, ensure_ascii=False)
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(payload)
+    os.replace(tmp, GRAPH_FILE)
 
 
-def add_concepts(graph, concepts_data):
+def add_concepts(graph, concepts_data, today=None):
     """Add or update concepts in the graph.
 
     concepts_data: list of dicts with keys:
       id (str), labels (dict), category (str),
       broader (list), narrower (list), related (list)
+    today: YYYY-MM-DD date to stamp (defaults to the current UTC date).
     """
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    today = today or _today()
     for c in concepts_data:
         cid = c["id"]
         if cid in graph["concepts"]:
@@ -97,59 +121,74 @@ def add_concepts(graph, concepts_data):
             }
 
 
-def record_cooccurrences(graph, keywords):
+def record_cooccurrences(graph, keywords, today=None):
     """Record keyword co-occurrences from a session.
 
     keywords: list of concept IDs that appeared together.
+    today: YYYY-MM-DD date to stamp (defaults to the current UTC date).
     """
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    today = today or _today()
+    edges = graph["edges"]
+    # Index only the edges between this session's keywords, keyed by the
+    # ordered (src, tgt) pair and pointing at the edge dict itself
+    words = set(keywords)
     edge_map = {}
-    for i, e in enumerate(graph["edges"]):
-        key = (min(e["src"], e["tgt"]), max(e["src"], e["tgt"]))
-        edge_map[key] = i
-
-    for a, b in combinations(sorted(set(keywords)), 2):
-        key = (min(a, b), max(a, b))
-        if key in edge_map:
-            graph["edges"][edge_map[key]]["w"] += 1
-            graph["edges"][edge_map[key]]["lastSeen"] = today
+    for e in edges:
+        src, tgt = e["src"], e["tgt"]
+        if src in words and tgt in words:
+            edge_map[(src, tgt) if src <= tgt else (tgt, src)] = e
+
+    # combinations() of the sorted keywords already yields ordered pairs
+    for key in combinations(sorted(words), 2):
+        edge = edge_map.get(key)
+        if edge is not None:
+            edge["w"] += 1
+            edge["lastSeen"] = today
         else:
-            graph["edges"].append(
-                {"src": key[0], "tgt": key[1], "w": 1, "lastSeen": today}
-            )
-            edge_map[key] = len(graph["edges"]) - 1
+            edge = {"src": key[0], "tgt": key[1], "w": 1, "lastSeen": today}
+            edges.append(edge)
+            edge_map[key] = edge
 
 
-def apply_decay(graph):
+def apply_decay(graph, today=None):
     """Apply half-life decay to all concept weights.
 
     Uses: decayed = weight * 2^(-days_elapsed / half_life)
     Prunes concepts with weight < 0.01 and sessionCount <= 1.
+    today: YYYY-MM-DD date to decay to (defaults to the current UTC date).
     """
     half_life = graph["meta"].get("halfLifeDays", 90)
-    today = datetime.now(timezone.utc).date()
+    today = _parse_day(today or _today())
 
     to_remove = []
+    # Concepts cluster on a few lastSeen days; compute each day's factor once
+    factors = {}
     for cid, concept in graph["concepts"].items():
         last_seen = concept.get("lastSeen", "")
         if not last_seen:
             continue
         try:
-            last = datetime.strptime(last_seen, "%Y-%m-%d").date()
+            last = _parse_day(last_seen)
             days = (today - last).days
             if days <= 0:
                 continue
-            decay_factor = math.pow(2, -days / half_life)
+            decay_factor = factors.get(days)
+            if decay_factor is None:
+                decay_factor = factors[days] = math.pow(2, -days / half_life)
             concept["weight"] *= decay_factor
             if concept["weight"] < 0.01 and concept["sessionCount"] <= 1:
                 to_remove.append(cid)
         except ValueError:
             continue
 
-    for cid in to_remove:
-        del graph["concepts"][cid]
+    if to_remove:
+        for cid in to_remove:
+            del graph["concepts"][cid]
+        # One pass over the edges for all pruned concepts
+        removed = set(to_remove)
         graph["edges"] = [
-            e for e in graph["edges"] if e["src"] != cid and e["tgt"] != cid
+            e for e in graph["edges"]
+            if e["src"] not in removed and e["tgt"] not in removed
         ]
 
 
@@ -158,29 +197,29 @@ def suggest_topics(graph, n=5, recent_sessions=None, seed=None):
 
     Returns: list of (concept_id, score, reason) tuples, sorted by score desc.
     """
-    if seed is not None:
-        random.seed(seed)
-
     recent = set(recent_sessions or [])
     half_life = graph["meta"].get("halfLifeDays", 90)
     today = datetime.now(timezone.utc).date()
+    # Seeded calls draw from a private generator, leaving the global state alone
+    betavariate = (random.Random(seed) if seed is not None else random).betavariate
 
+    # Score every candidate (one Beta draw each, in graph order), but keep only
+    # the inputs of the reason string; it is built for the top n alone
     candidates = []
     for cid, concept in graph["concepts"].items():
-        if concept["weight"] < 0.05:
-            continue
-        if cid in recent:
+        if concept["weight"] < 0.05 or cid in recent:
             continue
 
-        alpha = concept.get("bandit", {}).get("alpha", 1)
-        beta_val = concept.get("bandit", {}).get("beta", 1)
-        ts_score = random.betavariate(max(alpha, 0.1), max(beta_val, 0.1))
+        bandit = concept.get("bandit", {})
+        alpha = bandit.get("alpha", 1)
+        beta_val = bandit.get("beta", 1)
+        ts_score = betavariate(max(alpha, 0.1), max(beta_val, 0.1))
 
         last_seen = concept.get("lastSeen", "")
         days = 0
         if last_seen:
             try:
-                days = (today - datetime.strptime(last_seen, "%Y-%m-%d").date()).days
+                days = (today - _parse_day(last_seen)).days
                 decay = math.pow(2, -days / half_life)
             except ValueError:
                 decay = 0.5
@@ -195,20 +234,26 @@ def suggest_topics(graph, n=5, recent_sessions=None, seed=None):
         serendipity = 1.0 / (1.0 + connection_count * 0.1)
 
         score = ts_score * decay * (1.0 + 0.3 * serendipity)
+        candidates.append((cid, score, days, connection_count, alpha, beta_val))
 
-        if days > 60:
-            reason = "revisit (not seen in a while)"
-        elif connection_count == 0:
-            reason = "unexplored connection"
-        elif alpha > beta_val * 2:
-            reason = "strong interest"
-        else:
-            reason = "balanced exploration"
+    # nlargest is O(N log n) and keeps graph order among equal scores, like the
+    # stable full sort it replaces
+    top = heapq.nlargest(n, candidates, key=itemgetter(1))
+    return [
+        (cid, score, _suggestion_reason(days, connection_count, alpha, beta_val))
+        for cid, score, days, connection_count, alpha, beta_val in top
+    ]
 
-        candidates.append((cid, score, reason))
 
-    candidates.sort(key=lambda x: -x[1])
-    return candidates[:n]
+def _suggestion_reason(days, connection_count, alpha, beta_val):
+    """Why a concept was suggested, from the same inputs that scored it."""
+    if days > 60:
+        return "revisit (not seen in a while)"
+    if connection_count == 0:
+        return "unexplored connection"
+    if alpha > beta_val * 2:
+        return "strong interest"
+    return "balanced exploration"
 
 
 def update_bandit(graph, concept_id, engaged):
@@ -225,6 +270,63 @@ def update_bandit(graph, concept_id, engaged):
         bandit["beta"] = bandit.get("beta", 1) + 1
 
 
+_BATCH_OPS = ("add-concepts", "record-session", "update-bandit", "decay")
+
+
+def _valid_concept_data(c):
+    """True if c has the shape add_concepts expects."""
+    return (
+        isinstance(c, dict)
+        and isinstance(c.get("id"), str)
+        and isinstance(c.get("labels", {}), dict)
+        and all(isinstance(c.get(rel, []), list) for rel in ("broader", "narrower", "related"))
+    )
+
+
+def apply_operations(graph, operations, today=None):
+    """Apply a list of CLI-style operations to one in-memory graph.
+
+    operations: list of dicts, each {"op": <name>, "data": <payload>}:
+      add-concepts   data = concepts list (as for add_concepts)
+      record-session data = keywords list (also bumps totalSessions)
+      update-bandit  data = {"id": concept_id, "engaged": bool}
+      decay          no data
+    Every op's name and data shape are validated before any is applied;
+    raises ValueError on the first bad one, leaving the graph untouched.
+    The caller saves the graph once afterwards.
+    """
+    if not isinstance(operations, list):
+        raise ValueError("Batch operations must be a JSON list")
+    for pos, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            raise ValueError(f"Batch op #{pos} is not an object")
+        op, data = operation.get("op"), operation.get("data")
+        if op not in _BATCH_OPS:
+            raise ValueError(f"Unknown batch op: {op}")
+        if op == "add-concepts":
+            if not isinstance(data, list) or not all(map(_valid_concept_data, data)):
+                raise ValueError(f"Batch op #{pos} ({op}): data must be a list of objects with an id")
+        elif op == "record-session":
+            if not isinstance(data, list) or not all(isinstance(k, str) for k in data):
+                raise ValueError(f"Batch op #{pos} ({op}): data must be a list of keywords")
+        elif op == "update-bandit":
+            if not isinstance(data, dict) or not isinstance(data.get("id"), str) or "engaged" not in data:
+                raise ValueError(f"Batch op #{pos} ({op}): data must have id and engaged")
+
+    today = today or _today()
+    for operation in operations:
+        op, data = operation["op"], operation.get("data")
+        if op == "add-concepts":
+            add_concepts(graph, data, today)
+        elif op == "record-session":
+            record_cooccurrences(graph, data, today)
+            graph["meta"]["totalSessions"] = graph["meta"].get("totalSessions", 0) + 1
+        elif op == "update-bandit":
+            update_bandit(graph, data["id"], data["engaged"])
+        else:
+            apply_decay(graph, today)
+
+
 def generate_markdown(graph):
     """Generate user-interests.md content from the interest graph.
 
@@ -302,10 +404,10 @@ def generate_brief(graph, max_concepts=15, max_communities=5, max_gaps=5):
 
     lines = []
 
-    # Top Concepts by weight
-    sorted_concepts = sorted(
-        graph["concepts"].items(), key=lambda x: -x[1]["weight"]
-    )[:max_concepts]
+    # Top Concepts by weight (partial selection; ties keep graph order)
+    sorted_concepts = heapq.nlargest(
+        max_concepts, graph["concepts"].items(), key=lambda x: x[1]["weight"]
+    )
     lines.append("Top Concepts:")
     for cid, concept in sorted_concepts:
         label = concept["labels"].get("en", cid)
@@ -344,92 +446,87 @@ def generate_brief(graph, max_concepts=15, max_communities=5, max_gaps=5):
     return "\n".join(lines)
 
 
-def migrate_from_markdown(md_path):
+def migrate_from_markdown(md_path, today=None):
     """Parse existing user-interests.md and create interest-graph.json.
 
     Returns the populated graph (also saves it to disk).
     """
-    with open(md_path, "r", encoding="utf-8") as f:
-        content = f.read()
-
     graph = _empty_graph()
-
-    # Parse frontmatter
-    in_fm = False
-    for line in content.split("\n"):
-        if line.strip() == "---":
-            if in_fm:
-                break
-            in_fm = True
-            continue
-        if in_fm and ":" in line:
-            k, v = line.split(":", 1)
-            k, v = k.strip(), v.strip()
-            if k == "session_count":
-                try:
-                    graph["meta"]["totalSessions"] = int(v)
-                except ValueError:
-                    pass
-
-    # Parse categories and keywords
     current_category = "general"
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-
-    for line in content.split("\n"):
-        cat_match = re.match(r"^## (.+)", line)
-        if cat_match:
-            title = cat_match.group(1).strip()
-            if title in (
-                "Recently Explored",
-                "Explored Topics Archive",
-                "Suggested Next Directions",
-                "User Interests",
-            ):
-                current_category = None
+    today = today or _today()
+
+    # One streaming pass: frontmatter (0 = before, 1 = inside, 2 = done)
+    # is tracked alongside the category/keyword parse, which sees every line.
+    fm_state = 0
+    with open(md_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if fm_state < 2:
+                if line.strip() == "---":
+                    fm_state += 1
+                elif fm_state == 1 and ":" in line:
+                    k, v = line.split(":", 1)
+                    k, v = k.strip(), v.strip()
+                    if k == "session_count":
+                        try:
+                            graph["meta"]["totalSessions"] = int(v)
+                        except ValueError:
+                            pass
+
+            # Cheap prefix checks first; most lines are neither headings nor keywords
+            cat_match = line.startswith("## ") and _CAT_RE.match(line)
+            if cat_match:
+                title = cat_match.group(1).strip()
+                if title in (
+                    "Recently Explored",
+                    "Explored Topics Archive",
+                    "Suggested Next Directions",
+                    "User Interests",
+                ):
+                    current_category = None
+                    continue
+                current_category = (
+                    title.lower().replace(" & ", "-").replace(" ", "-")
+                )
                 continue
-            current_category = (
-                title.lower().replace(" & ", "-").replace(" ", "-")
-            )
-            continue
 
-        if current_category is None:
-            continue
+            if current_category is None:
+                continue
 
-        kw_match = re.match(r"^- \*\*keywords\*\*: \[(.+)\]", line)
-        if kw_match:
-            keywords_raw = kw_match.group(1)
-            keywords = [k.strip() for k in keywords_raw.split(",")]
-
-            for kw in keywords:
-                slug = kw.lower().replace(" ", "-")
-                if slug not in graph["concepts"]:
-                    graph["concepts"][slug] = {
-                        "labels": {"en": kw},
-                        "category": current_category,
-                        "weight": 1.0,
-                        "lastSeen": today,
-                        "sessionCount": 1,
-                        "broader": (
-                            [current_category]
-                            if current_category != "general"
-                            else []
-                        ),
-                        "narrower": [],
-                        "related": [],
-                        "bandit": {"alpha": 1, "beta": 1},
-                    }
-
-            # Build co-occurrence edges from adjacent keywords
-            slugs = [k.lower().replace(" ", "-") for k in keywords]
-            for i in range(len(slugs) - 1):
-                a, b = min(slugs[i], slugs[i + 1]), max(slugs[i], slugs[i + 1])
-                if a != b:
-                    graph["edges"].append(
-                        {"src": a, "tgt": b, "w": 1, "lastSeen": today}
-                    )
-
-    graph["meta"]["lastUpdated"] = today
-    save_graph(graph)
+            kw_match = line.startswith("- **keywords**: [") and _KW_RE.match(line)
+            if kw_match:
+                keywords_raw = kw_match.group(1)
+                keywords = [k.strip() for k in keywords_raw.split(",")]
+
+                for kw in keywords:
+                    slug = kw.lower().replace(" ", "-")
+                    if slug not in graph["concepts"]:
+                        graph["concepts"][slug] = {
+                            "labels": {"en": kw},
+                            "category": current_category,
+                            "weight": 1.0,
+                            "lastSeen": today,
+                            "sessionCount": 1,
+                            "broader": (
+                                [current_category]
+                                if current_category != "general"
+                                else []
+                            ),
+                            "narrower": [],
+                            "related": [],
+                            "bandit": {"alpha": 1, "beta": 1},
+                        }
+
+                # Build co-occurrence edges from adjacent keywords
+                slugs = [k.lower().replace(" ", "-") for k in keywords]
+                for i in range(len(slugs) - 1):
+                    a, b = min(slugs[i], slugs[i + 1]), max(slugs[i], slugs[i + 1])
+                    if a != b:
+                        graph["edges"].append(
+                            {"src": a, "tgt": b, "w": 1, "lastSeen": today}
+                        )
+
+    save_graph(graph, today)
     return graph
 
 
@@ -448,15 +545,19 @@ def detect_communities(graph, min_edge_weight=2):
 
     labels = {node: node for node in adj}
 
+    # Every neighbor is itself a key of adj, so labels[n] always exists
+    label_of = labels.__getitem__
     for _ in range(10):
         changed = False
-        for node in adj:
-            if not adj[node]:
-                continue
-            neighbor_labels = [labels.get(n, n) for n in adj[node]]
-            most_common = Counter(neighbor_labels).most_common(1)[0][0]
-            if labels[node] != most_common:
-                labels[node] = most_common
+        for node, neighbors in adj.items():
+            if len(neighbors) == 1:
+                best = labels[neighbors[0]]
+            else:
+                # First label to reach the top count wins, as with most_common(1)
+                counts = Counter(map(label_of, neighbors))
+                best = max(counts, key=counts.__getitem__)
+            if labels[node] != best:
+                labels[node] = best
                 changed = True
         if not changed:
             break
@@ -468,11 +569,15 @@ def detect_communities(graph, min_edge_weight=2):
     return communities
 
 
-def find_gaps(graph, n=5, max_nodes=500):
+def find_gaps(graph, n=5, max_nodes=None, max_degree=200):
     """Find structural gaps: concept pairs that share neighbors but aren't connected.
 
     Returns list of (node_a, node_b, shared_count, shared_list) tuples.
-    Skips O(n^2) scan when the graph exceeds max_nodes to avoid slow execution.
+    Candidate pairs are enumerated via two-hop walks, so only pairs that
+    actually share a neighbor are visited. Hubs with more than max_degree
+    neighbors are neither walked through nor counted as shared, which bounds
+    the walk at O(max_degree * edges); None disables the cap. Pass max_nodes
+    to skip the scan (returning []) for graphs larger than that.
     """
     adj = {}
     for e in graph["edges"]:
@@ -484,28 +589,27 @@ def find_gaps(graph, n=5, max_nodes=500):
                 adj.setdefault(cid, set()).add(other)
                 adj.setdefault(other, set()).add(cid)
 
-    nodes = list(adj.keys())
-
-    # Safeguard: skip O(n^2) pairwise scan for very large graphs
-    if len(nodes) > max_nodes:
+    if max_nodes is not None and len(adj) > max_nodes:
         return []
 
+    # Adjacency is symmetric, so the number of two-hop walks u -> v -> w
+    # equals |adj[u] & adj[w]|; pairs are keyed by insertion order (u < w).
+    index = {node: i for i, node in enumerate(adj)}
+    hubs = set()
+    if max_degree is not None:
+        hubs = {v for v, nbrs in adj.items() if len(nbrs) > max_degree}
     gaps = []
-    seen = set()
-    for i, node_a in enumerate(nodes):
-        for node_b in nodes[i + 1:]:
-            if node_b in adj.get(node_a, set()):
-                continue
-            key = (node_a, node_b)
-            if key in seen:
-                continue
-            seen.add(key)
-
-            shared = adj.get(node_a, set()) & adj.get(node_b, set())
-            if len(shared) >= 2:
-                gaps.append((node_a, node_b, len(shared), sorted(shared)))
-
-    gaps.sort(key=lambda x: -x[2])
+    for node_a, nbrs_a in adj.items():
+        i = index[node_a]
+        walks = Counter()
+        for v in nbrs_a:
+            if v not in hubs:
+                walks.update(w for w in adj[v] if index[w] > i)
+        for node_b, count in walks.items():
+            if count >= 2 and node_b not in nbrs_a:
+                gaps.append((node_a, node_b, count, sorted((nbrs_a & adj[node_b]) - hubs)))
+
+    gaps.sort(key=lambda x: (-x[2], index[x[0]], index[x[1]]))
     return gaps[:n]
 
 
@@ -514,12 +618,14 @@ def find_gaps(graph, n=5, max_nodes=500):
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print(
-            "Usage: interest_graph.py <load|add-concepts|record-session|suggest|decay|generate-md|migrate|update-bandit> [args...]",
+            "Usage: interest_graph.py <load|add-concepts|record-session|suggest|decay|generate-md|migrate|update-bandit|batch> [args...]",
             file=sys.stderr,
         )
         sys.exit(1)
 
     cmd = sys.argv[1]
+    # One date for the whole invocation, shared by every stamping step
+    today = _today()
 
     if cmd == "load":
         graph = load_graph()
@@ -534,8 +640,8 @@ if __name__ == "__main__":
             sys.exit(1)
         graph = load_graph()
         concepts_data = json.loads(sys.argv[2])
-        add_concepts(graph, concepts_data)
-        save_graph(graph)
+        add_concepts(graph, concepts_data, today)
+        save_graph(graph, today)
         print(f"Updated: {len(graph['concepts'])} concepts")
 
     elif cmd == "record-session":
@@ -544,9 +650,9 @@ if __name__ == "__main__":
             sys.exit(1)
         graph = load_graph()
         keywords = json.loads(sys.argv[2])
-        record_cooccurrences(graph, keywords)
+        record_cooccurrences(graph, keywords, today)
         graph["meta"]["totalSessions"] = graph["meta"].get("totalSessions", 0) + 1
-        save_graph(graph)
+        save_graph(graph, today)
         print(f"Recorded session: {len(keywords)} keywords, {len(graph['edges'])} edges")
 
     elif cmd == "suggest":
@@ -563,9 +669,9 @@ if __name__ == "__main__":
     elif cmd == "decay":
         graph = load_graph()
         before = len(graph["concepts"])
-        apply_decay(graph)
+        apply_decay(graph, today)
         after = len(graph["concepts"])
-        save_graph(graph)
+        save_graph(graph, today)
         pruned = before - after
         if pruned > 0:
             print(f"Decay applied: {pruned} concepts pruned, {after} remaining")
@@ -583,7 +689,7 @@ if __name__ == "__main__":
 
     elif cmd == "migrate":
         md_path = sys.argv[2] if len(sys.argv) > 2 else str(MD_FILE)
-        graph = migrate_from_markdown(md_path)
+        graph = migrate_from_markdown(md_path, today)
         print(f"Migrated: {len(graph['concepts'])} concepts, {len(graph['edges'])} edges")
 
     elif cmd == "communities":
@@ -612,13 +718,29 @@ if __name__ == "__main__":
         concept_id = sys.argv[2]
         engaged = sys.argv[3].lower() in ("true", "1", "yes")
         update_bandit(graph, concept_id, engaged)
-        save_graph(graph)
+        save_graph(graph, today)
         if concept_id in graph["concepts"]:
             b = graph["concepts"][concept_id]["bandit"]
             print(f"Updated {concept_id}: alpha={b['alpha']}, beta={b['beta']}")
         else:
             print(f"Concept not found: {concept_id}")
 
+    elif cmd == "batch":
+        if len(sys.argv) < 3:
+            print("Usage: interest_graph.py batch <operations_json>", file=sys.stderr)
+            sys.exit(1)
+        graph = load_graph()
+        try:
+            operations = json.loads(sys.argv[2])
+            apply_operations(graph, operations, today)
+        except ValueError as e:  # includes json.JSONDecodeError
+            print(str(e), file=sys.stderr)
+            sys.exit(1)
+        # One save for the whole batch instead of one per operation
+        save_graph(graph, today)
+        print(f"Applied {len(operations)} operations: "
+              f"{len(graph['concepts'])} concepts, {len(graph['edges'])} edges")
+
     else:
         print(f"Unknown command: {cmd}", file=sys.stderr)
         sys.exit(1)
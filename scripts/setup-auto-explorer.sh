@@ -410,7 +410,7 @@ if [[ -f ".claude/auto-explorer.local.md" ]]; then
     echo ""
     # Record stale session in history before removing
     python "$SCRIPT_DIR/history.py" end "$STALE_SLUG" "$STALE_ITER" "error" "Stale session auto-cleaned (>24h)" 2>/dev/null || true
-    rm -f ".claude/auto-explorer.local.md"
+    rm -f ".claude/auto-explorer.local.md" ".claude/auto-explorer-transcript-cursor.json"
   else
     # Show active session details so the user knows what's running
     ACTIVE_INFO=$(python "$SCRIPT_DIR/helpers.py" active-info ".claude/auto-explorer.local.md" "$SEP" 2>/dev/null || echo "unknown${SEP}?${SEP}0${SEP}?")
@@ -437,9 +437,17 @@ if [[ -n "$FORCE_MODE" ]]; then
 fi
 
 # --- Improvement engine suggestions (v1.9.0) ---
+# Template, budget and repeat hints come from one process (one history parse)
+TOPIC_WORDS=$(python "$SCRIPT_DIR/helpers.py" extract-topic-words "$TOPIC" 2>/dev/null || echo "[]")
+WANT_TEMPLATE=1
+if [[ -n "$TEMPLATE_NAME" ]]; then
+  WANT_TEMPLATE=0
+fi
+HINTS=$(python "$SCRIPT_DIR/improvement_engine.py" setup-hints "$MODE" "$TOPIC_WORDS" "$SEP" "$WANT_TEMPLATE" 2>/dev/null || echo "")
+IFS="$SEP" read -r TPL_SUGGESTION BUDGET_SUGGESTION REPEAT_MATCH <<< "$HINTS"
+
 # Show template recommendation if user didn't specify --template
 if [[ -z "$TEMPLATE_NAME" ]]; then
-  TPL_SUGGESTION=$(python "$SCRIPT_DIR/improvement_engine.py" suggest-template "$MODE" 2>/dev/null || echo "")
   if [[ -n "$TPL_SUGGESTION" ]]; then
     echo "Suggested template: $TPL_SUGGESTION"
     echo "   (use --template <name> to apply)"
@@ -448,7 +456,6 @@ if [[ -z "$TEMPLATE_NAME" ]]; then
 fi
 
 # Show budget recommendation if data supports it
-BUDGET_SUGGESTION=$(python "$SCRIPT_DIR/improvement_engine.py" suggest-budget "$MODE" 2>/dev/null || echo "")
 if [[ -n "$BUDGET_SUGGESTION" ]]; then
   echo "Budget hint: history suggests '$BUDGET_SUGGESTION' for $MODE sessions"
   echo "   (use --budget $BUDGET_SUGGESTION to apply)"
@@ -456,8 +463,6 @@ if [[ -n "$BUDGET_SUGGESTION" ]]; then
 fi
 
 # Detect repeat topic — warn if this topic overlaps with a recent session
-TOPIC_WORDS=$(python "$SCRIPT_DIR/helpers.py" extract-topic-words "$TOPIC" 2>/dev/null || echo "[]")
-REPEAT_MATCH=$(python "$SCRIPT_DIR/improvement_engine.py" detect-repeat "$TOPIC_WORDS" 2>/dev/null || echo "")
 if [[ -n "$REPEAT_MATCH" ]]; then
   echo "Note: $REPEAT_MATCH"
   echo "   Consider --resume to continue the previous session instead."
@@ -3,6 +3,8 @@
 
 import json
 import os
+import shutil
+import subprocess
 import sys
 import tempfile
 import unittest
@@ -67,6 +69,144 @@ class TestGetSessionTokens(unittest.TestCase):
         os.unlink(f.name)
         self.assertEqual(result, 150)
 
+    def test_only_top_level_usage_counted(self):
+        lines = [
+            json.dumps({"usage": {"output_tokens": 10}}),
+            json.dumps({"message": {"usage": {"output_tokens": 999}}}),
+            json.dumps({"role": "user", "content": "no usage here"}),
+            json.dumps({"content": 'mentions "output_tokens": 5 in text', "usage": {"output_tokens": 1}}),
+        ]
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".jsonl", delete=False) as f:
+            f.write("\n".join(lines) + "\n")
+        try:
+            self.assertEqual(check_rate_limits.get_session_tokens(f.name), 11)
+        finally:
+            os.unlink(f.name)
+
+
+class TestLineOutputTokens(unittest.TestCase):
+    """Test the per-line regex fast path and its json.loads fallback."""
+
+    def test_top_level_usage_last(self):
+        line = b'{"a": 1, "usage": {"input_tokens": 1, "output_tokens": 7, "x": 2}}'
+        self.assertEqual(check_rate_limits._line_output_tokens(line), 7)
+
+    def test_nested_usage_last_not_counted(self):
+        line = b'{"message": {"usage": {"output_tokens": 5}}}'
+        self.assertEqual(check_rate_limits._line_output_tokens(line), 0)
+
+    def test_top_level_usage_not_last_uses_fallback(self):
+        line = b'{"usage": {"output_tokens": 5}, "m": {"usage": {"output_tokens": 9}}}'
+        self.assertEqual(check_rate_limits._line_output_tokens(line), 5)
+
+    def test_usage_with_nested_object(self):
+        line = b'{"usage": {"cache_creation": {"e": 1}, "output_tokens": 4}}'
+        self.assertEqual(check_rate_limits._line_output_tokens(line), 4)
+
+    def test_truncated_line(self):
+        self.assertEqual(check_rate_limits._line_output_tokens(b'{"usage": {"output_tokens": 5'), 0)
+
+
+class TestSessionTokenCursor(unittest.TestCase):
+    """Test incremental transcript scanning via the cursor sidecar."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.transcript = Path(self.tmpdir.name) / "transcript.jsonl"
+        self.cursor = Path(self.tmpdir.name) / "cursor.json"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _append(self, *tokens, newline=True):
+        with open(self.transcript, "a", encoding="utf-8") as f:
+            for t in tokens:
+                f.write(json.dumps({"usage": {"output_tokens": t}}) + ("\n" if newline else ""))
+
+    def test_appended_lines_accumulate(self):
+        self._append(100, 200)
+        self.assertEqual(check_rate_limits.get_session_tokens(str(self.transcript), self.cursor), 300)
+        self._append(50)
+        self.assertEqual(check_rate_limits.get_session_tokens(str(self.transcript), self.cursor), 350)
+        cursor = json.loads(self.cursor.read_text(encoding="utf-8"))
+        self.assertEqual(cursor["offset"], self.transcript.stat().st_size)
+        self.assertEqual(cursor["total"], 350)
+
+    def test_partial_trailing_line_not_committed(self):
+        self._append(100)
+        self._append(40, newline=False)
+        self.assertEqual(check_rate_limits.get_session_tokens(str(self.transcript), self.cursor), 140)
+        with open(self.transcript, "a", encoding="utf-8") as f:
+            f.write("\n")
+        self._append(10)
+        self.assertEqual(check_rate_limits.get_session_tokens(str(self.transcript), self.cursor), 150)
+
+    def test_rewritten_transcript_triggers_full_scan(self):
+        self._append(100, 200)
+        check_rate_limits.get_session_tokens(str(self.transcript), self.cursor)
+        with open(self.transcript, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"usage": {"output_tokens": 7}}) + "\n")
+            f.write(json.dumps({"usage": {"output_tokens": 8}}) + "\n")
+        self.assertEqual(check_rate_limits.get_session_tokens(str(self.transcript), self.cursor), 15)
+
+    def test_same_length_rewrite_at_start_triggers_full_scan(self):
+        self._append(100, 200, 300, 400)
+        check_rate_limits.get_session_tokens(str(self.transcript), self.cursor)
+        with open(self.transcript, "r+", encoding="utf-8") as f:
+            f.write(json.dumps({"usage": {"output_tokens": 900}}))
+        self.assertEqual(check_rate_limits.get_session_tokens(str(self.transcript), self.cursor), 1800)
+
+    def test_truncated_transcript_triggers_full_scan(self):
+        self._append(100, 200, 300)
+        check_rate_limits.get_session_tokens(str(self.transcript), self.cursor)
+        self.transcript.write_text("", encoding="utf-8")
+        self._append(5)
+        self.assertEqual(check_rate_limits.get_session_tokens(str(self.transcript), self.cursor), 5)
+
+    def test_corrupt_cursor_ignored(self):
+        self._append(100)
+        self.cursor.write_text("not json", encoding="utf-8")
+        self.assertEqual(check_rate_limits.get_session_tokens(str(self.transcript), self.cursor), 100)
+
+
+@unittest.skipUnless(shutil.which("bash"), "bash not available")
+class TestCursorCleanup(unittest.TestCase):
+    """The transcript cursor goes away with the state file when a session ends."""
+
+    def _run_hook(self, tmpdir, state, summary_pending=False):
+        claude_dir = Path(tmpdir) / ".claude"
+        claude_dir.mkdir()
+        (claude_dir / "auto-explorer.local.md").write_text(state, encoding="utf-8")
+        (Path(tmpdir) / check_rate_limits.CURSOR_FILE).write_text('{"offset": 0}', encoding="utf-8")
+        if summary_pending:
+            (claude_dir / "auto-explorer-summary-pending").write_text("done", encoding="utf-8")
+        hook = Path(__file__).parent.parent / "hooks" / "stop-hook.sh"
+        result = subprocess.run(
+            ["bash", str(hook)], input="{}", cwd=tmpdir, capture_output=True, text=True,
+            env={**os.environ, "HOME": tmpdir}, timeout=60,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertFalse((claude_dir / "auto-explorer.local.md").exists())
+        self.assertFalse((Path(tmpdir) / check_rate_limits.CURSOR_FILE).exists())
+
+    def test_removed_on_corrupt_state(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self._run_hook(tmpdir, "---\niteration: x\nmax_iterations: 5\n---\n")
+
+    def test_removed_at_max_iterations(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self._run_hook(tmpdir, "---\niteration: 5\nmax_iterations: 5\ntopic: t\n"
+                                   "topic_slug: t\noutput_dir: out\n---\n")
+
+    def test_removed_after_summary(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self._run_hook(tmpdir, "---\niteration: 2\nmax_iterations: 5\ntopic: t\n"
+                                   "topic_slug: t\noutput_dir: out\n---\n", summary_pending=True)
+
+    def test_cancel_explore_removes_cursor(self):
+        skill = Path(__file__).parent.parent / ".claude" / "skills" / "cancel-explore" / "SKILL.md"
+        self.assertIn(check_rate_limits.CURSOR_FILE.as_posix(), skill.read_text(encoding="utf-8"))
+
 
 class TestGetDailyTokens(unittest.TestCase):
     """Test daily token extraction from stats-cache."""
@@ -92,6 +232,103 @@ class TestGetDailyTokens(unittest.TestCase):
         self.assertEqual(result.get("2026-02-16", 0), 0)
 
 
+class TestWindowTokens(unittest.TestCase):
+    """Test prefix-sum rolling windows over daily tokens."""
+
+    def _ord(self, date_str):
+        return datetime.strptime(date_str, "%Y-%m-%d").date().toordinal()
+
+    def test_weekly_window_matches_naive_sum(self):
+        daily = {"2026-02-01": 5, "2026-02-10": 10, "2026-02-12": 20, "2026-02-16": 40, "bad-date": 99}
+        cumulative = check_rate_limits.cumulative_tokens(daily)
+        end = self._ord("2026-02-16")
+        # 2026-02-10 .. 2026-02-16 inclusive
+        self.assertEqual(check_rate_limits.window_tokens(cumulative, end, 7), 70)
+        self.assertEqual(check_rate_limits.window_tokens(cumulative, end, 1), 40)
+
+    def test_window_outside_history(self):
+        cumulative = check_rate_limits.cumulative_tokens({"2026-02-10": 10})
+        self.assertEqual(check_rate_limits.window_tokens(cumulative, self._ord("2026-03-01"), 7), 0)
+        self.assertEqual(check_rate_limits.window_tokens(cumulative, self._ord("2026-01-01"), 7), 0)
+
+    def test_empty_daily(self):
+        cumulative = check_rate_limits.cumulative_tokens({})
+        self.assertEqual(check_rate_limits.window_tokens(cumulative, self._ord("2026-02-16"), 7), 0)
+
+
+class TestLoadDailyTokens(unittest.TestCase):
+    """Test the mtime+size keyed stats cache."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.stats_file = Path(self.tmpdir.name) / "stats.json"
+        self.cache_file = Path(self.tmpdir.name) / check_rate_limits.DAILY_CACHE_NAME
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _write_stats(self, tokens):
+        with open(self.stats_file, "w", encoding="utf-8") as f:
+            json.dump({"dailyModelTokens": [{"date": "2026-02-16", "tokensByModel": {"m": tokens}}]}, f)
+
+    def test_missing_stats(self):
+        self.assertIsNone(check_rate_limits.load_daily_tokens(self.stats_file))
+
+    def test_writes_sidecar(self):
+        self._write_stats(100)
+        daily, _ = check_rate_limits.load_daily_tokens(self.stats_file)
+        self.assertEqual(daily, {"2026-02-16": 100})
+        self.assertTrue(self.cache_file.exists())
+
+    def test_cache_hit_skips_parse(self):
+        self._write_stats(100)
+        check_rate_limits.load_daily_tokens(self.stats_file)
+        with patch.object(check_rate_limits, "get_daily_tokens") as mock_get:
+            daily, cumulative = check_rate_limits.load_daily_tokens(self.stats_file)
+        mock_get.assert_not_called()
+        self.assertEqual(daily, {"2026-02-16": 100})
+        self.assertEqual(check_rate_limits.window_tokens(cumulative, cumulative[0], 7), 100)
+
+    def test_stats_change_invalidates(self):
+        self._write_stats(100)
+        check_rate_limits.load_daily_tokens(self.stats_file)
+        self._write_stats(123456)
+        daily, _ = check_rate_limits.load_daily_tokens(self.stats_file)
+        self.assertEqual(daily, {"2026-02-16": 123456})
+
+
+class TestGetSessionStartTime(unittest.TestCase):
+    """Test started_at extraction from the state file head."""
+
+    def _start_time(self, content):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            state_file = Path(tmpdir) / "state.md"
+            state_file.write_text(content, encoding="utf-8")
+            with patch.object(check_rate_limits, "STATE_FILE", state_file):
+                return check_rate_limits.get_session_start_time()
+
+    def test_quoted_started_at(self):
+        result = self._start_time('---\ntopic: "x"\nstarted_at: "2026-02-16T10:00:00Z"\n---\nbody\n')
+        self.assertEqual(result, datetime(2026, 2, 16, 10, 0, tzinfo=timezone.utc))
+
+    def test_ignores_started_at_outside_frontmatter(self):
+        content = '---\ntopic: x\n---\nstarted_at: 2026-01-01T00:00:00Z\n'
+        self.assertIsNone(self._start_time(content))
+
+    def test_large_body_after_frontmatter(self):
+        content = '---\nstarted_at: 2026-02-16T10:00:00Z\n---\n' + "log line\n" * 100000
+        self.assertEqual(self._start_time(content), datetime(2026, 2, 16, 10, 0, tzinfo=timezone.utc))
+
+    def test_frontmatter_longer_than_head(self):
+        padding = "".join(f"key{i}: {'v' * 40}\n" for i in range(200))
+        content = f'---\n{padding}started_at: "2026-02-16T10:00:00Z"\n---\n'
+        self.assertEqual(self._start_time(content), datetime(2026, 2, 16, 10, 0, tzinfo=timezone.utc))
+
+    def test_missing_state_file(self):
+        with patch.object(check_rate_limits, "STATE_FILE", Path("/nonexistent/state.md")):
+            self.assertIsNone(check_rate_limits.get_session_start_time())
+
+
 class TestCheckLimits(unittest.TestCase):
     """Test the main check_limits function."""
 
@@ -164,6 +401,38 @@ class TestCheckLimits(unittest.TestCase):
 
             self.assertFalse(result["allowed"])
 
+    def test_transcript_not_read_without_enabled_windows(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            limits_file = Path(tmpdir) / "limits.json"
+            stats_file = Path(tmpdir) / "stats.json"
+            self._write_json(limits_file, {"rate_limits": {"daily": {"tokens": 0}, "4h": {"tokens": 0}}})
+            self._write_json(stats_file, {"dailyModelTokens": []})
+
+            with patch.object(check_rate_limits, "LIMITS_FILE", limits_file), \
+                 patch.object(check_rate_limits, "STATS_FILE", stats_file), \
+                 patch.object(check_rate_limits, "get_session_tokens") as mock_tokens:
+                result = check_rate_limits.check_limits(transcript_path="/some/transcript.jsonl")
+
+            mock_tokens.assert_not_called()
+            self.assertTrue(result["allowed"])
+
+    def test_transcript_read_once_for_all_windows(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            limits_file = Path(tmpdir) / "limits.json"
+            stats_file = Path(tmpdir) / "stats.json"
+            self._write_json(limits_file, {"rate_limits": {
+                "daily": {"tokens": 1000}, "weekly": {"tokens": 1000}, "4h": {"tokens": 1000}}})
+            self._write_json(stats_file, {"dailyModelTokens": []})
+
+            with patch.object(check_rate_limits, "LIMITS_FILE", limits_file), \
+                 patch.object(check_rate_limits, "STATS_FILE", stats_file), \
+                 patch.object(check_rate_limits, "STATE_FILE", Path(tmpdir) / "state.md"), \
+                 patch.object(check_rate_limits, "get_session_tokens", return_value=100) as mock_tokens:
+                result = check_rate_limits.check_limits(transcript_path="/some/transcript.jsonl")
+
+            mock_tokens.assert_called_once()
+            self.assertEqual([d["used"] for d in result["details"]], [100, 100, 100])
+
 
 class TestThresholdOverride(unittest.TestCase):
     """Test that threshold_override takes precedence."""
@@ -198,5 +467,37 @@ class TestThresholdOverride(unittest.TestCase):
             self.assertTrue(result_lenient["allowed"])
 
 
+class TestFormatResult(unittest.TestCase):
+    """Test the fixed-schema JSON emitter."""
+
+    def test_round_trips_window_details(self):
+        result = {"allowed": False, "details": [
+            {"window": "daily", "used": 700000, "limit": 1000000, "threshold": 0.6,
+             "pct": 70.0, "exceeded": True},
+            {"window": "4h", "used": 0, "limit": 1e6, "threshold": 0.6, "pct": 0.0,
+             "hours_running": 1.5, "exceeded": False},
+        ]}
+        self.assertEqual(json.loads(check_rate_limits.format_result(result)), result)
+
+    def test_escapes_status_strings(self):
+        result = {"allowed": True, "details": [{"window": "config", "status": 'say "hi"\n — ok'}]}
+        self.assertEqual(json.loads(check_rate_limits.format_result(result)), result)
+
+    def test_non_finite_threshold_matches_json_dumps(self):
+        result = {"allowed": True, "details": [
+            {"window": "daily", "used": 1, "limit": 10, "threshold": float("inf"),
+             "pct": 10.0, "exceeded": False},
+            {"window": "4h", "used": 1, "limit": 10, "threshold": float("nan"),
+             "pct": 10.0, "hours_running": 0.5, "exceeded": False},
+        ]}
+        output = check_rate_limits.format_result(result)
+        self.assertEqual(output, json.dumps(result, separators=(",", ":")))
+        self.assertIn('"threshold":Infinity', output)
+
+    def test_empty_details(self):
+        output = check_rate_limits.format_result({"allowed": True, "details": []})
+        self.assertEqual(output, '{"allowed":true,"details":[]}')
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -116,6 +116,23 @@ class TestGraphBrief(unittest.TestCase):
         concept_lines = [l for l in brief.split("\n") if l.startswith("  - ") and "weight:" in l]
         self.assertEqual(len(concept_lines), 5)
 
+    def test_top_concepts_heaviest_first_ties_in_graph_order(self):
+        concepts = {}
+        for cid, weight in [("a", 1.0), ("b", 3.0), ("c", 2.0), ("d", 3.0), ("e", 2.0)]:
+            concepts[cid] = {
+                "labels": {"en": cid.upper()},
+                "category": "general",
+                "weight": weight,
+                "lastSeen": "2026-02-17",
+                "sessionCount": 1,
+                "broader": [], "narrower": [], "related": [],
+                "bandit": {"alpha": 1, "beta": 1},
+            }
+        graph = self._make_graph(concepts=concepts)
+        brief = interest_graph.generate_brief(graph, max_concepts=3)
+        concept_lines = [l for l in brief.split("\n") if l.startswith("  - ") and "weight:" in l]
+        self.assertEqual([l.split()[1] for l in concept_lines], ["B", "D", "C"])
+
     def test_communities_included(self):
         concepts = {
             "docker": {
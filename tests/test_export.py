@@ -4,6 +4,8 @@
 import os
 import tempfile
 import unittest
+from pathlib import Path
+from unittest.mock import patch
 
 from conftest import import_script
 
@@ -27,6 +29,31 @@ class TestConvertInline(unittest.TestCase):
         self.assertIn('href="http://example.com"', result)
         self.assertIn(">text<", result)
 
+    def test_quotes_and_ampersand_escaped(self):
+        self.assertEqual(export_html.convert_inline('a & "b" \'c\''), "a &amp; &quot;b&quot; &#x27;c&#x27;")
+
+    def test_plain_text_unchanged(self):
+        self.assertEqual(export_html.convert_inline("plain prose line"), "plain prose line")
+
+    def test_code_inside_bold(self):
+        result = export_html.convert_inline("**use `f()` here**")
+        self.assertEqual(result, "<strong>use <code>f()</code> here</strong>")
+
+    def test_code_span_keeps_asterisks(self):
+        self.assertEqual(export_html.convert_inline("`a*b*c`"), "<code>a*b*c</code>")
+
+    def test_bold_link_text(self):
+        result = export_html.convert_inline("[**x**](http://example.com)")
+        self.assertEqual(result, '<a href="http://example.com"><strong>x</strong></a>')
+
+    def test_italic_around_bold(self):
+        result = export_html.convert_inline("*a **b** c*")
+        self.assertEqual(result, "<em>a <strong>b</strong> c</em>")
+
+    def test_triple_asterisks(self):
+        # Bold is converted before italic, as it always has been
+        self.assertEqual(export_html.convert_inline("***x***"), "<strong><em>x</strong></em>")
+
     def test_html_escaping(self):
         result = export_html.convert_inline("<script>alert(1)</script>")
         self.assertNotIn("<script>", result)
@@ -213,6 +240,16 @@ class TestGenerateReport(unittest.TestCase):
             with self.assertRaises(SystemExit):
                 export_html.generate_report(tmpdir)
 
+    def test_md_named_directory_ignored(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.mkdir(os.path.join(tmpdir, "notes.md"))
+            with open(os.path.join(tmpdir, "01-real.md"), "w", encoding="utf-8") as f:
+                f.write("# Real\n")
+            result = export_html.generate_report(tmpdir)
+            content = result.read_text(encoding="utf-8")
+        self.assertIn("01-real.md", content)
+        self.assertNotIn("notes.md", content)
+
     def test_cjk_content(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             with open(os.path.join(tmpdir, "00-test.md"), "w", encoding="utf-8") as f:
@@ -225,6 +262,80 @@ class TestGenerateReport(unittest.TestCase):
             self.assertIn("這是測試內容", content)
 
 
+class TestRenderCache(unittest.TestCase):
+    """Test the content-hash render cache used by generate_report."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmpdir.name)
+        self.cache_dir = self.dir / export_html.CACHE_DIR_NAME
+        self.md_file = self.dir / "01-notes.md"
+        self.md_file.write_text("# Notes\n\nFirst draft.\n", encoding="utf-8")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_report_populates_cache(self):
+        export_html.generate_report(self.tmpdir.name)
+        self.assertEqual(len(list(self.cache_dir.glob("01-notes-*.html"))), 1)
+
+    def test_cache_hit_skips_conversion(self):
+        content = self.md_file.read_text(encoding="utf-8")
+        first = export_html.render_file(self.md_file, content, self.cache_dir)
+        with patch.object(export_html, "md_to_html") as mock_convert:
+            second = export_html.render_file(self.md_file, content, self.cache_dir)
+        mock_convert.assert_not_called()
+        self.assertEqual(first, second)
+
+    def test_changed_source_replaces_entry(self):
+        export_html.render_file(self.md_file, "# Notes\n\nv1\n", self.cache_dir)
+        file_html = export_html.render_file(self.md_file, "# Notes\n\nv2\n", self.cache_dir)
+        self.assertIn("v2", file_html)
+        self.assertEqual(len(list(self.cache_dir.glob("01-notes-*.html"))), 1)
+
+    def test_other_files_entries_kept(self):
+        other = self.dir / "01-notes-extra.md"
+        export_html.render_file(other, "# Extra\n", self.cache_dir)
+        export_html.render_file(self.md_file, "# Notes\n\nv1\n", self.cache_dir)
+        export_html.render_file(self.md_file, "# Notes\n\nv2\n", self.cache_dir)
+        self.assertEqual(len(list(self.cache_dir.glob("01-notes-extra-*.html"))), 1)
+
+    def test_interrupted_write_leaves_no_entry(self):
+        content = "# Notes\n\nv1\n"
+        with patch.object(export_html.os, "replace", side_effect=OSError):
+            export_html.render_file(self.md_file, content, self.cache_dir)
+        self.assertEqual(list(self.cache_dir.glob("*.html")), [])
+        with patch.object(export_html, "md_to_html", return_value="<p>v1</p>") as mock_convert:
+            export_html.render_file(self.md_file, content, self.cache_dir)
+        mock_convert.assert_called_once()
+
+    def test_stale_entries_pruned_once_per_batch(self):
+        files = [self.dir / f"{i:02d}-part.md" for i in range(3)]
+        export_html.render_files(files, [f"v1 {i}" for i in range(3)], self.cache_dir)
+        with patch.object(export_html.os, "scandir", wraps=os.scandir) as mock_scandir:
+            export_html.render_files(files, [f"v2 {i}" for i in range(3)], self.cache_dir)
+        self.assertEqual(mock_scandir.call_count, 1)
+        self.assertEqual(len(list(self.cache_dir.glob("*-part-*.html"))), 3)
+
+
+class TestRenderFiles(unittest.TestCase):
+    """Test batch rendering of multiple files."""
+
+    def _files(self, tmpdir, n):
+        files, contents = [], []
+        for i in range(n):
+            files.append(Path(tmpdir) / f"{i:02d}-part.md")
+            contents.append(f"# Part {i}\n\nBody **{i}**\n")
+        return files, contents
+
+    def test_preserves_order(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            files, contents = self._files(tmpdir, 6)
+            results = export_html.render_files(files, contents)
+        self.assertEqual(results, [export_html.md_to_html(c) for c in contents])
+        self.assertIn("<strong>5</strong>", results[5])
+
+
 class TestMdToHtmlEdgeCases(unittest.TestCase):
     """Test edge cases in Markdown conversion."""
 
@@ -8,13 +8,17 @@ Covers: parse_frontmatter, make_slug, check_stale_session, get_stale_info,
         get_session_stats, append_telemetry.
 """
 
+import io
 import json
 import os
+import subprocess
+import sys
 import tempfile
 import unittest
 from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
 
-from conftest import import_script
+from conftest import import_script, SCRIPTS_DIR
 
 helpers = import_script("helpers.py")
 
@@ -51,6 +55,47 @@ class TestParseFrontmatter(unittest.TestCase):
         fields = helpers.parse_frontmatter(content)
         self.assertEqual(fields["started_at"], "2026-02-16T10:30:00Z")
 
+    def test_last_duplicate_wins(self):
+        content = '---\nmode: build\nmode: research\n---\nmode: body\n'
+        self.assertEqual(helpers.parse_frontmatter(content), {"mode": "research"})
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "state.md")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+            self.assertEqual(helpers.read_frontmatter(path), {"mode": "research"})
+
+    def test_read_frontmatter_crlf_and_cr_line_endings(self):
+        expected = {"topic": "a", "mode": "build"}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "state.md")
+            for content in (b'---\r\ntopic: a\r\nmode: build\r\n---\r\nbody\r\n',
+                            b'---\rtopic: a\rmode: build\r---\rbody\r'):
+                with open(path, "wb") as f:
+                    f.write(content)
+                self.assertEqual(helpers.read_frontmatter(path), expected)
+                with open(path, "r", encoding="utf-8") as f:
+                    self.assertEqual(helpers.parse_frontmatter(f.read()), expected)
+
+    def test_read_frontmatter_stops_at_closing_delimiter(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "state.md")
+            with open(path, "wb") as f:
+                f.write(b'---\ntopic: "Rust"\nmode: build\n---\n\xff\xfe body\n')
+            self.assertEqual(helpers.read_frontmatter(path), {"topic": "Rust", "mode": "build"})
+
+    def test_indented_delimiters_and_crlf(self):
+        content = '---\r\ntopic: test\r\n  ---  \r\nafter: ignored\r\n'
+        self.assertEqual(helpers.parse_frontmatter(content), {"topic": "test"})
+
+    def test_split_returns_body_after_closing(self):
+        fields, body = helpers._split_frontmatter('---\nmode: build\n---\nBody\n')
+        self.assertEqual(fields, {"mode": "build"})
+        self.assertEqual(body.strip(), "Body")
+
+    def test_split_without_closing_keeps_whole_body(self):
+        content = "---\ntopic: test\n"
+        self.assertEqual(helpers._split_frontmatter(content)[1], content)
+
 
 class TestMakeSlug(unittest.TestCase):
     """Test slug generation."""
@@ -65,6 +110,10 @@ class TestMakeSlug(unittest.TestCase):
         slug = helpers.make_slug("分散式系統")
         self.assertTrue(slug.startswith("topic-"))
         self.assertEqual(len(slug), len("topic-") + 8)
+        self.assertEqual(slug, helpers.make_slug("分散式系統"))
+        # Same MD5-derived slug as earlier releases, so findings dirs carry over
+        self.assertEqual(slug, "topic-ab34fda2")
+        self.assertNotEqual(slug, helpers.make_slug("日本語テスト"))
 
     def test_mixed_cjk_and_english(self):
         slug = helpers.make_slug("Rust 非同步程式設計")
@@ -188,6 +237,14 @@ class TestFormatDuration(unittest.TestCase):
         self.assertNotEqual(result, "?")
         self.assertTrue(result.endswith("m"))
 
+    def test_hours_format(self):
+        started = (datetime.now(timezone.utc) - timedelta(hours=2, minutes=15, seconds=5)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        self.assertEqual(helpers.format_duration(started), "2h 15m")
+
+    def test_now_tracks_wall_clock(self):
+        delta = abs((helpers._now_utc() - datetime.now(timezone.utc)).total_seconds())
+        self.assertLess(delta, 1)
+
 
 class TestFormatRateSummary(unittest.TestCase):
     """Test rate check JSON formatting."""
@@ -375,6 +432,16 @@ class TestGetSessionStats(unittest.TestCase):
             tokens, files, kb = helpers.get_session_stats(transcript, output_dir)
             self.assertEqual(files, 4)  # all files counted
 
+    def test_subdirectories_not_counted(self):
+        """Only regular files in the output directory are counted."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.makedirs(os.path.join(tmpdir, ".cache"))
+            with open(os.path.join(tmpdir, "00-overview.md"), "w") as f:
+                f.write("x" * 2048)
+            tokens, files, kb = helpers.get_session_stats(None, tmpdir)
+            self.assertEqual(files, 1)
+            self.assertAlmostEqual(kb, 2.0)
+
     def test_computes_output_kb(self):
         """Should compute total output size in KB."""
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -389,6 +456,32 @@ class TestGetSessionStats(unittest.TestCase):
             tokens, files, kb = helpers.get_session_stats(transcript, output_dir)
             self.assertAlmostEqual(kb, 1.0, places=0)
 
+    def test_malformed_and_non_utf8_lines_skipped(self):
+        """Undecodable lines are skipped without losing the rest."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            transcript = os.path.join(tmpdir, "transcript.jsonl")
+            with open(transcript, "wb") as f:
+                f.write(b'{"usage": {"output_tokens": 40}}\n')
+                f.write(b'{"usage": {"output_tokens": \n')
+                f.write(b'{"text": "\xff", "usage": {"output_tokens": 5}}\n')
+                f.write(b'{"usage": {"output_tokens": 2}}\n')
+            tokens, files, kb = helpers.get_session_stats(transcript, None)
+            self.assertEqual(tokens, 42)
+
+    def test_cursor_resumes_from_previous_scan(self):
+        """With a cursor file, appended lines are added to the saved total."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            transcript = os.path.join(tmpdir, "transcript.jsonl")
+            cursor = os.path.join(tmpdir, "cursor.json")
+            with open(transcript, "w", encoding="utf-8") as f:
+                f.write('{"usage": {"output_tokens": 500}}\n')
+            self.assertEqual(helpers.get_session_stats(transcript, None, cursor)[0], 500)
+            self.assertTrue(os.path.exists(cursor))
+            with open(transcript, "a", encoding="utf-8") as f:
+                f.write('{"usage": {"output_tokens": 25}}\n')
+            self.assertEqual(helpers.get_session_stats(transcript, None, cursor)[0], 525)
+            self.assertEqual(helpers.get_session_stats(transcript, None)[0], 525)
+
     def test_missing_transcript(self):
         """Should return 0 tokens for missing transcript."""
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -423,6 +516,15 @@ class TestGetSessionStats(unittest.TestCase):
 class TestSuggestTopics(unittest.TestCase):
     """Test extracting multiple topic suggestions."""
 
+    def test_stops_reading_after_max_count(self):
+        """Content past the last needed suggestion is never decoded."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "user-interests.md")
+            with open(path, "wb") as f:
+                f.write(b"## Suggested Next Directions\n1. First\n")
+                f.write(b"x" * 65536 + b"\n\xff\xfe\n")
+            self.assertEqual(helpers.suggest_topics(path, max_count=1), ["First"])
+
     def test_extracts_multiple(self):
         content = """# Interests
 ## Suggested Next Directions
@@ -506,6 +608,12 @@ class TestComputeQualitySignals(unittest.TestCase):
         self.assertEqual(iter_ratio, round(1 / 10, 2))  # max(0, 1) = 1
         self.assertEqual(output_density, 10.0)
 
+    def test_budget_iterations_band_edges(self):
+        self.assertEqual(helpers.budget_iterations(0.75), 5)
+        self.assertEqual(helpers.budget_iterations(0.74), 10)
+        self.assertEqual(helpers.budget_iterations(0.56), 10)
+        self.assertEqual(helpers.budget_iterations(0.55), 20)
+
 
 class TestExtractTopicWords(unittest.TestCase):
     """Test topic word extraction for repeat detection."""
@@ -536,6 +644,10 @@ class TestExtractTopicWords(unittest.TestCase):
         parsed = json.loads(result)
         self.assertIsInstance(parsed, list)
 
+    def test_escaped_words_fall_back_to_json_dumps(self):
+        topic = 'say "hello" to C:\\temp café'
+        self.assertEqual(helpers.extract_topic_words(topic), json.dumps(['say', '"hello"', 'c:\\temp', 'café']))
+
 
 class TestReadStateFields(unittest.TestCase):
     """Test the shared state file reader."""
@@ -554,6 +666,41 @@ class TestReadStateFields(unittest.TestCase):
     def test_missing_file_returns_none(self):
         self.assertIsNone(helpers._read_state_fields("/nonexistent/file.md"))
 
+    def test_rewritten_file_is_reparsed(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "state.md")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("---\niteration: 1\n---\n")
+            self.assertEqual(helpers._read_state_fields(path)["iteration"], "1")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("---\niteration: 22\n---\n")
+            self.assertEqual(helpers._read_state_fields(path)["iteration"], "22")
+
+    def test_same_size_rewrite_with_unchanged_mtime(self):
+        """A just-written file is keyed on content, so a rewrite that keeps
+        size and mtime is still seen."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "state.md")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("---\niteration: 1\n---\n")
+            st = os.stat(path)
+            self.assertEqual(helpers._read_state_fields(path)["iteration"], "1")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("---\niteration: 2\n---\n")
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+            self.assertEqual(helpers._read_state_fields(path)["iteration"], "2")
+
+    def test_repeat_reads_hit_cache(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "state.md")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("---\ntopic: cached\n---\n")
+            helpers._read_state_fields_keyed.cache_clear()
+            first = helpers._read_state_fields(path)
+            first["topic"] = "mutated"
+            self.assertEqual(helpers._read_state_fields(path)["topic"], "cached")
+            self.assertEqual(helpers._read_state_fields_keyed.cache_info().hits, 1)
+
     def test_used_by_check_stale(self):
         """Verify check_stale_session still works after refactoring to _read_state_fields."""
         recent_time = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -615,6 +762,84 @@ class TestAppendTelemetry(unittest.TestCase):
         finally:
             os.unlink(path)
 
+    def test_timestamp_format(self):
+        ts = helpers._utc_timestamp()
+        parsed = datetime.strptime(ts, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+        self.assertLess(abs((datetime.now(timezone.utc) - parsed).total_seconds()), 5)
+
+    def test_appends_to_existing_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'outcomes.jsonl')
+            helpers.append_telemetry(path, 'slug', '1', 'research', '100', '1.0', 'sub')
+            helpers.append_telemetry(path, 'slug', '2', 'research', '200', '2.0', 'next')
+            with open(path, 'r', encoding='utf-8') as f:
+                iterations = [json.loads(l)['iteration'] for l in f]
+            self.assertEqual(iterations, [1, 2])
+
+
+class TestDispatch(unittest.TestCase):
+    """Tests for the CLI dispatcher and the batch subcommand."""
+
+    def test_returns_command_output(self):
+        self.assertEqual(helpers._dispatch('budget-iterations', ['0.8'], lambda: ''), '5')
+
+    def test_json_output_matches_dict_dump(self):
+        reason, msg = 'Continue "deep"\n\u7814\u7a76', 'iter 2/5'
+        out = helpers._dispatch('json-output', [reason, msg], lambda: '')
+        self.assertEqual(out, json.dumps({'decision': 'block', 'reason': reason, 'systemMessage': msg}))
+
+    def test_stdin_bytes_accepted(self):
+        stdin = '{"transcript_path": "/tmp/研究.jsonl"}'.encode('utf-8')
+        out = helpers._dispatch('extract-json-field', ['transcript_path'], lambda: stdin)
+        self.assertEqual(out, '/tmp/研究.jsonl')
+
+    def test_parse_frontmatter_command(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "state.md")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write('---\niteration: 3\ntopic: "Rust"\nextra: x\nmode: build\n---\nBody\n')
+            out = helpers._dispatch('parse-frontmatter', [path, '|'], lambda: '')
+        self.assertEqual(out, '3|||Rust|||build|')
+
+    def test_unknown_command_raises(self):
+        with self.assertRaises(helpers._CommandError):
+            helpers._dispatch('no-such-command', [], lambda: '')
+
+    def test_batch_runs_each_request(self):
+        requests = [
+            {'cmd': 'make-slug-and-mode', 'args': ['Build a CLI', '|']},
+            {'cmd': 'extract-json-field', 'args': ['path'], 'stdin': '{"path": "/t.jsonl"}'},
+            {'cmd': 'no-such-command'},
+        ]
+        out = helpers._dispatch('batch', [], lambda: json.dumps(requests))
+        self.assertEqual(json.loads(out), ['build-a-cli|build', '/t.jsonl', None])
+
+    def test_batch_non_object_entry_reported_alone(self):
+        requests = [1, {'cmd': 'budget-iterations', 'args': ['0.8']}, ['x']]
+        with patch('sys.stderr', new_callable=io.StringIO):
+            out = helpers._dispatch('batch', [], lambda: json.dumps(requests))
+        self.assertEqual(json.loads(out), [None, '5', None])
+
+    def test_batch_rejects_non_list_payload(self):
+        for payload in ('{"cmd": "budget-iterations"}', 'not json'):
+            with self.assertRaises(helpers._CommandError):
+                helpers._dispatch('batch', [], lambda: payload)
+
+    def test_batch_cli_bad_input_without_traceback(self):
+        result = subprocess.run(
+            [sys.executable, str(SCRIPTS_DIR / "helpers.py"), "batch"],
+            input="[1]", capture_output=True, text=True,
+        )
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(json.loads(result.stdout), [None])
+        result = subprocess.run(
+            [sys.executable, str(SCRIPTS_DIR / "helpers.py"), "batch"],
+            input="{}", capture_output=True, text=True,
+        )
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("Usage: batch", result.stderr)
+        self.assertNotIn("Traceback", result.stderr)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -6,6 +6,7 @@ import os
 import sys
 import tempfile
 import unittest
+from datetime import datetime, timezone
 from pathlib import Path
 from unittest.mock import patch
 
@@ -115,6 +116,23 @@ class TestHistoryEnd(unittest.TestCase):
             # Nothing should change
             self.assertEqual(data[0]["status"], "running")
 
+    def test_end_no_match_leaves_file_untouched(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            hist_file = Path(tmpdir) / ".history.json"
+            raw = '[{"slug": "other", "status": "running"}]'
+            hist_file.write_text(raw, encoding="utf-8")
+            with patch.object(history, "HISTORY_FILE", hist_file):
+                history.cmd_end(["nonexistent", "5", "completed"])
+            self.assertEqual(hist_file.read_text(encoding="utf-8"), raw)
+
+    def test_save_leaves_no_temp_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            hist_file = Path(tmpdir) / ".history.json"
+            with patch.object(history, "HISTORY_FILE", hist_file):
+                history.save_history([{"slug": "a"}])
+            self.assertEqual(os.listdir(tmpdir), [".history.json"])
+            self.assertEqual(json.loads(hist_file.read_text(encoding="utf-8")), [{"slug": "a"}])
+
 
 class TestFixStaleSessions(unittest.TestCase):
     """Test stale session cleanup."""
@@ -151,6 +169,13 @@ class TestFixStaleSessions(unittest.TestCase):
         self.assertFalse(result)
         self.assertEqual(entries[0]["status"], "running")  # unchanged
 
+    def test_ended_at_matches_strftime_format(self):
+        before = datetime.now(timezone.utc).replace(microsecond=0)
+        stamp = history._now_iso_z()
+        parsed = datetime.strptime(stamp, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+        self.assertEqual(len(stamp), 20)
+        self.assertGreaterEqual(parsed, before)
+
 
 class TestFormatDuration(unittest.TestCase):
     """Test duration formatting."""
@@ -173,6 +198,10 @@ class TestFormatDuration(unittest.TestCase):
         result = history.format_duration("invalid", "also-invalid")
         self.assertEqual(result, "?")
 
+    def test_open_ended_uses_given_now(self):
+        now = datetime(2026, 2, 16, 11, 5, tzinfo=timezone.utc)
+        self.assertEqual(history.format_duration("2026-02-16T10:00:00Z", None, now), "1h 5m")
+
 
 class TestStatusIcon(unittest.TestCase):
     """Test status icon mapping."""
@@ -2,6 +2,7 @@
 """Tests for improvement_engine.py"""
 
 import json
+import math
 import os
 import sys
 import tempfile
@@ -37,6 +38,62 @@ def _make_session(slug="test", mode="research", status="completed",
     return entry
 
 
+class TestLoadCompletedSessions(unittest.TestCase):
+    """Test history loading and its stat-keyed cache."""
+
+    def _write(self, path, entries):
+        # Same write pattern as history.save_history (temp file + os.replace)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(tmp, path)
+
+    def test_missing_file(self):
+        with mock.patch.object(ie, "HISTORY_FILE", Path("/nonexistent/.history.json")):
+            self.assertEqual(ie.load_completed_sessions(), [])
+
+    def test_filters_statuses(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, ".history.json")
+            self._write(path, [
+                _make_session(slug="a"),
+                _make_session(slug="b", status="running"),
+                _make_session(slug="c", status="max-iterations"),
+            ])
+            with mock.patch.object(ie, "HISTORY_FILE", Path(path)):
+                slugs = [s["slug"] for s in ie.load_completed_sessions()]
+        self.assertEqual(slugs, ["a", "c"])
+
+    def test_keyword_sets_kept_beside_sessions(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, ".history.json")
+            self._write(path, [
+                _make_session(slug="a", keywords=["docker", "helm", "docker"]),
+                _make_session(slug="b"),
+            ])
+            with mock.patch.object(ie, "HISTORY_FILE", Path(path)):
+                sessions, keyword_sets = ie._load_completed()
+                sessions[0]["slug"] = "mutated"
+                again = ie.load_completed_sessions()
+        self.assertEqual(keyword_sets, (frozenset({"docker", "helm"}), frozenset()))
+        # Records stay plain JSON and each call gets its own dicts
+        json.dumps(sessions)
+        self.assertEqual(again[0]["slug"], "a")
+        match = ie.detect_repeat_topic(again, ["docker", "helm"], keyword_sets=keyword_sets)
+        self.assertEqual(match["slug"], "a")
+
+    def test_cache_hit_and_reload_after_replace(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, ".history.json")
+            self._write(path, [_make_session(slug="a")])
+            with mock.patch.object(ie, "HISTORY_FILE", Path(path)):
+                ie.load_completed_sessions()
+                with mock.patch.object(ie.json, "load", side_effect=AssertionError("reparsed")):
+                    self.assertEqual(len(ie.load_completed_sessions()), 1)
+                self._write(path, [_make_session(slug="b")])
+                self.assertEqual(ie.load_completed_sessions()[0]["slug"], "b")
+
+
 class TestTemplateStats(unittest.TestCase):
     """Test per-template performance aggregation."""
 
@@ -143,6 +200,13 @@ class TestSuggestBudget(unittest.TestCase):
         result = ie.suggest_budget(sessions, "research")
         self.assertIsNone(result)
 
+    def test_only_recent_ten_in_mode_count(self):
+        sessions = [_make_session(mode="research", iter_ratio=0.2) for _ in range(5)]
+        for _ in range(10):
+            sessions.append(_make_session(mode="research", iter_ratio=0.99))
+            sessions.append(_make_session(mode="build", iter_ratio=0.1))
+        self.assertEqual(ie.suggest_budget(sessions, "research"), "aggressive")
+
 
 class TestModeCorrection(unittest.TestCase):
     """Test mode auto-detection accuracy tracking."""
@@ -217,6 +281,16 @@ class TestDetectRepeat(unittest.TestCase):
         self.assertIsNotNone(result)
         self.assertEqual(result["slug"], "docker-k8s")
 
+    def test_size_bound_keeps_exact_threshold_match(self):
+        """|B| = |A| / threshold is still within the size bound."""
+        sessions = [_make_session(slug="wide", keywords=["a", "b", "c", "d"])]
+        result = ie.detect_repeat_topic(sessions, ["a", "b"], threshold=0.5)
+        self.assertEqual(result["slug"], "wide")
+
+    def test_size_bound_skips_much_larger_session(self):
+        sessions = [_make_session(keywords=["a", "b", "c", "d", "e"])]
+        self.assertIsNone(ie.detect_repeat_topic(sessions, ["a", "b"], threshold=0.5))
+
     def test_empty_keywords(self):
         sessions = [_make_session(keywords=["docker"])]
         result = ie.detect_repeat_topic(sessions, [])
@@ -248,6 +322,42 @@ class TestExtractKeywords(unittest.TestCase):
         keywords = [kw for kw, _ in result]
         self.assertIn("docker", keywords)
 
+    def test_only_md_files_are_read(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            (Path(tmpdir) / "notes.md").write_text("docker", encoding="utf-8")
+            (Path(tmpdir) / "notes.txt").write_text("python", encoding="utf-8")
+            (Path(tmpdir) / "folder.md").mkdir()
+            result = ie.extract_keywords_tfidf(tmpdir)
+        self.assertEqual(result, [("docker", 1.0)])
+
+    def test_undecodable_file_skipped(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for i in range(8):
+                (Path(tmpdir) / f"{i:02d}.md").write_text(f"common word{i}", encoding="utf-8")
+            (Path(tmpdir) / "bad.md").write_bytes(b"\xff\xfe broken broken broken")
+            result = dict(ie.extract_keywords_tfidf(tmpdir, top_n=20))
+        self.assertNotIn("broken", result)
+        self.assertEqual(result["common"], 8.0)
+
+    def test_stop_words_do_not_crowd_out_top_n(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            (Path(tmpdir) / "a.md").write_text(
+                "the the the and and and for for for with with with docker helm",
+                encoding="utf-8",
+            )
+            result = ie.extract_keywords_tfidf(tmpdir, top_n=2)
+        self.assertEqual(sorted(kw for kw, _ in result), ["docker", "helm"])
+
+    def test_scores_are_count_times_idf(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            (Path(tmpdir) / "a.md").write_text("docker docker shared", encoding="utf-8")
+            (Path(tmpdir) / "b.md").write_text("docker shared", encoding="utf-8")
+            (Path(tmpdir) / "c.md").write_text("shared python", encoding="utf-8")
+            result = dict(ie.extract_keywords_tfidf(tmpdir, top_n=5))
+        self.assertEqual(result["shared"], 3.0)  # in every doc: idf = 1
+        self.assertEqual(result["docker"], round(3 * (math.log(3 / 2) + 1), 1))
+        self.assertEqual(result["python"], round(math.log(3) + 1, 1))
+
 
 class TestCLI(unittest.TestCase):
     """Test CLI dispatch."""
@@ -261,6 +371,27 @@ class TestCLI(unittest.TestCase):
         )
         self.assertNotEqual(result.returncode, 0)
 
+    def test_setup_hints_joins_all_three(self):
+        import subprocess
+        script = str(Path(__file__).parent.parent / "scripts" / "improvement_engine.py")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            history_dir = Path(tmpdir) / "auto-explore-findings"
+            history_dir.mkdir()
+            sessions = [
+                _make_session(slug="docker-k8s", iter_ratio=0.99, keywords=["docker", "kubernetes"])
+                for _ in range(3)
+            ]
+            (history_dir / ".history.json").write_text(json.dumps(sessions), encoding="utf-8")
+            result = subprocess.run(
+                [sys.executable, script, "setup-hints", "research", '["docker", "kubernetes"]', "\x1f", "0"],
+                capture_output=True, text=True, timeout=10, cwd=tmpdir,
+            )
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(
+            result.stdout.rstrip("\n").split("\x1f"),
+            ["", "aggressive", "Similar to: ? (docker-k8s)"],
+        )
+
     def test_no_args(self):
         import subprocess
         script = str(Path(__file__).parent.parent / "scripts" / "improvement_engine.py")
@@ -2,6 +2,7 @@
 """Tests for interest_graph.py"""
 
 import json
+import os
 import subprocess
 import sys
 import tempfile
@@ -58,6 +59,13 @@ class TestLoadSave(unittest.TestCase):
             self.assertEqual(saved["version"], 1)
             self.assertIn("lastUpdated", saved["meta"])
 
+    def test_save_leaves_no_temp_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fake_graph = Path(tmpdir) / "interest-graph.json"
+            with mock.patch.object(ig, "GRAPH_FILE", fake_graph):
+                ig.save_graph(ig._empty_graph())
+            self.assertEqual(os.listdir(tmpdir), ["interest-graph.json"])
+
     def test_round_trip(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             fake_graph = Path(tmpdir) / "interest-graph.json"
@@ -86,6 +94,13 @@ class TestAddConcepts(unittest.TestCase):
         self.assertEqual(graph["concepts"]["docker"]["sessionCount"], 1)
         self.assertEqual(graph["concepts"]["docker"]["bandit"], {"alpha": 1, "beta": 1})
 
+    def test_explicit_today_is_stamped(self):
+        graph = ig._empty_graph()
+        ig.add_concepts(graph, [{"id": "docker"}], today="2026-03-04")
+        ig.record_cooccurrences(graph, ["docker", "k8s"], today="2026-03-05")
+        self.assertEqual(graph["concepts"]["docker"]["lastSeen"], "2026-03-04")
+        self.assertEqual(graph["edges"][0]["lastSeen"], "2026-03-05")
+
     def test_update_existing_concept(self):
         graph = ig._empty_graph()
         graph["concepts"]["docker"] = {
@@ -165,6 +180,13 @@ class TestCooccurrence(unittest.TestCase):
         ig.record_cooccurrences(graph, ["python", "python", "docker"])
         self.assertEqual(len(graph["edges"]), 1)  # Only one unique pair
 
+    def test_reversed_stored_edge_is_incremented(self):
+        graph = ig._empty_graph()
+        graph["edges"] = [{"src": "rust", "tgt": "go", "w": 3, "lastSeen": "2024-01-01"}]
+        ig.record_cooccurrences(graph, ["go", "rust"])
+        self.assertEqual(len(graph["edges"]), 1)
+        self.assertEqual(graph["edges"][0]["w"], 4)
+
     def test_single_keyword_no_edges(self):
         graph = ig._empty_graph()
         ig.record_cooccurrences(graph, ["python"])
@@ -185,6 +207,17 @@ class TestDecay(unittest.TestCase):
         ig.apply_decay(graph)
         self.assertLess(graph["concepts"]["old"]["weight"], 8.0)
 
+    def test_explicit_today_sets_elapsed_days(self):
+        graph = ig._empty_graph()
+        graph["concepts"]["old"] = {
+            "labels": {"en": "Old"}, "category": "general",
+            "weight": 8.0, "lastSeen": "2026-01-01", "sessionCount": 5,
+            "broader": [], "narrower": [], "related": [],
+            "bandit": {"alpha": 1, "beta": 1},
+        }
+        ig.apply_decay(graph, today="2026-04-01")  # 90 days = one half-life
+        self.assertAlmostEqual(graph["concepts"]["old"]["weight"], 4.0)
+
     def test_recent_concept_no_decay(self):
         graph = ig._empty_graph()
         today = ig.datetime.now().strftime("%Y-%m-%d")
@@ -210,6 +243,25 @@ class TestDecay(unittest.TestCase):
         self.assertNotIn("dead", graph["concepts"])
         self.assertEqual(len(graph["edges"]), 0)
 
+    def test_prune_several_keeps_other_edges_in_order(self):
+        graph = ig._empty_graph()
+        for cid in ("dead1", "dead2"):
+            graph["concepts"][cid] = {
+                "labels": {"en": cid}, "category": "general",
+                "weight": 0.005, "lastSeen": "2024-01-01", "sessionCount": 1,
+                "broader": [], "narrower": [], "related": [],
+                "bandit": {"alpha": 1, "beta": 1},
+            }
+        graph["edges"] = [
+            {"src": "a", "tgt": "b", "w": 1, "lastSeen": "2024-01-01"},
+            {"src": "a", "tgt": "dead1", "w": 1, "lastSeen": "2024-01-01"},
+            {"src": "c", "tgt": "d", "w": 2, "lastSeen": "2024-01-01"},
+            {"src": "dead2", "tgt": "z", "w": 1, "lastSeen": "2024-01-01"},
+        ]
+        ig.apply_decay(graph)
+        self.assertEqual(graph["concepts"], {})
+        self.assertEqual([(e["src"], e["tgt"]) for e in graph["edges"]], [("a", "b"), ("c", "d")])
+
     def test_high_session_count_not_pruned(self):
         graph = ig._empty_graph()
         graph["concepts"]["veteran"] = {
@@ -250,6 +302,19 @@ class TestThompsonSampling(unittest.TestCase):
         r2 = ig.suggest_topics(graph, n=3, seed=42)
         self.assertEqual([x[0] for x in r1], [x[0] for x in r2])
 
+    def test_seed_leaves_global_random_state_alone(self):
+        graph = ig._empty_graph()
+        today = ig.datetime.now().strftime("%Y-%m-%d")
+        graph["concepts"]["a"] = {
+            "labels": {"en": "A"}, "category": "general",
+            "weight": 5.0, "lastSeen": today, "sessionCount": 3,
+            "broader": [], "narrower": [], "related": [],
+            "bandit": {"alpha": 2, "beta": 1},
+        }
+        state = ig.random.getstate()
+        ig.suggest_topics(graph, n=1, seed=42)
+        self.assertEqual(ig.random.getstate(), state)
+
     def test_recency_filter(self):
         graph = ig._empty_graph()
         today = ig.datetime.now().strftime("%Y-%m-%d")
@@ -307,6 +372,24 @@ class TestThompsonSampling(unittest.TestCase):
         self.assertEqual(len(results[0]), 3)  # (id, score, reason)
         self.assertIsInstance(results[0][2], str)
 
+    def test_top_n_sorted_with_own_reasons(self):
+        graph = ig._empty_graph()
+        today = ig.datetime.now().strftime("%Y-%m-%d")
+        for i in range(20):
+            graph["concepts"][f"c{i}"] = {
+                "labels": {"en": f"C{i}"}, "category": "general",
+                "weight": 5.0, "lastSeen": today, "sessionCount": 1,
+                "broader": [], "narrower": [], "related": ["x"] if i % 2 else [],
+                "bandit": {"alpha": 1, "beta": 1},
+            }
+        results = ig.suggest_topics(graph, n=4, seed=7)
+        self.assertEqual(len(results), 4)
+        scores = [score for _, score, _ in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        for cid, _, reason in results:
+            expected = "balanced exploration" if int(cid[1:]) % 2 else "unexplored connection"
+            self.assertEqual(reason, expected)
+
 
 class TestBanditFeedback(unittest.TestCase):
     """Test bandit update operations."""
@@ -522,6 +605,36 @@ version: 1
         import os
         os.unlink(md)
 
+    def test_near_miss_lines_are_ignored(self):
+        md = self._make_md("""# User Interests
+
+## Programming
+##Not A Heading
+- **keywords**:[skipped]
+  - **keywords**: [indented]
+- **keywords**: [python]
+""")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fake_graph = Path(tmpdir) / "interest-graph.json"
+            with mock.patch.object(ig, "GRAPH_FILE", fake_graph):
+                graph = ig.migrate_from_markdown(md)
+        self.assertEqual(list(graph["concepts"]), ["python"])
+        self.assertEqual(graph["concepts"]["python"]["category"], "programming")
+        os.unlink(md)
+
+    def test_crlf_file_and_keys_after_frontmatter(self):
+        md = self._make_md("")
+        with open(md, "w", encoding="utf-8", newline="") as f:
+            f.write("---\r\nsession_count: 4\r\n---\r\nsession_count: 99\r\n"
+                    "## Systems\r\n- **keywords**: [docker]\r\n")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fake_graph = Path(tmpdir) / "interest-graph.json"
+            with mock.patch.object(ig, "GRAPH_FILE", fake_graph):
+                graph = ig.migrate_from_markdown(md)
+        self.assertEqual(graph["meta"]["totalSessions"], 4)
+        self.assertEqual(graph["concepts"]["docker"]["category"], "systems")
+        os.unlink(md)
+
     def test_empty_file(self):
         md = self._make_md("")
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -693,10 +806,72 @@ class TestFindGaps(unittest.TestCase):
         # With max_nodes=5, should return empty (11 nodes > 5)
         gaps = ig.find_gaps(graph, n=5, max_nodes=5)
         self.assertEqual(gaps, [])
-        # With default max_nodes (500), should work normally
+        # Without max_nodes, should work normally
         gaps_normal = ig.find_gaps(graph, n=5)
         self.assertIsInstance(gaps_normal, list)
 
+    def test_large_star_graph_skips_hub(self):
+        """A 10k-leaf hub is not walked through, so this returns at once."""
+        graph = ig._empty_graph()
+        for i in range(10000):
+            graph["edges"].append({"src": "hub", "tgt": f"leaf{i}", "w": 1, "lastSeen": "2026-02-17"})
+        self.assertEqual(ig.find_gaps(graph), [])
+
+    def test_hub_not_counted_as_shared(self):
+        graph = ig._empty_graph()
+        for a, b in [("x", "m1"), ("y", "m1"), ("x", "m2"), ("y", "m2"),
+                     ("hub", "x"), ("hub", "y"), ("hub", "z")]:
+            graph["edges"].append({"src": a, "tgt": b, "w": 1, "lastSeen": "2026-02-17"})
+        self.assertEqual(ig.find_gaps(graph, n=1), [("x", "y", 3, ["hub", "m1", "m2"])])
+        self.assertEqual(ig.find_gaps(graph, n=1, max_degree=2), [("x", "y", 2, ["m1", "m2"])])
+
+    def test_large_graph_scanned_by_default(self):
+        """Graphs beyond the old 500-node cap should still report gaps."""
+        graph = ig._empty_graph()
+        today = ig.datetime.now().strftime("%Y-%m-%d")
+        for i in range(600):
+            graph["edges"].append({"src": "hub1", "tgt": f"n{i}", "w": 1, "lastSeen": today})
+        graph["edges"].append({"src": "hub2", "tgt": "n0", "w": 1, "lastSeen": today})
+        graph["edges"].append({"src": "hub2", "tgt": "n1", "w": 1, "lastSeen": today})
+        self.assertEqual(ig.find_gaps(graph, n=1), [("hub1", "hub2", 2, ["n0", "n1"])])
+
+
+class TestApplyOperations(unittest.TestCase):
+    """Test batched graph operations applied in memory."""
+
+    def test_applies_operations_in_order(self):
+        graph = ig._empty_graph()
+        ig.apply_operations(graph, [
+            {"op": "add-concepts", "data": [{"id": "docker"}, {"id": "k8s"}]},
+            {"op": "record-session", "data": ["docker", "k8s"]},
+            {"op": "update-bandit", "data": {"id": "docker", "engaged": True}},
+            {"op": "decay"},
+        ], today="2026-03-04")
+        self.assertEqual(graph["meta"]["totalSessions"], 1)
+        self.assertEqual(graph["edges"][0]["lastSeen"], "2026-03-04")
+        self.assertEqual(graph["concepts"]["docker"]["bandit"]["alpha"], 2)
+
+    def test_unknown_op_applies_nothing(self):
+        graph = ig._empty_graph()
+        with self.assertRaises(ValueError):
+            ig.apply_operations(graph, [
+                {"op": "add-concepts", "data": [{"id": "docker"}]},
+                {"op": "bogus"},
+            ])
+        self.assertEqual(graph["concepts"], {})
+
+    def test_malformed_op_applies_nothing(self):
+        good = {"op": "add-concepts", "data": [{"id": "docker"}]}
+        for bad in ("decay",
+                    {"op": "update-bandit", "data": {"engaged": True}},
+                    {"op": "add-concepts", "data": [{"labels": {"en": "X"}}]},
+                    {"op": "add-concepts", "data": [{"id": "x", "related": "y"}]},
+                    {"op": "record-session", "data": "docker"}):
+            graph = ig._empty_graph()
+            with self.assertRaises(ValueError):
+                ig.apply_operations(graph, [good, bad])
+            self.assertEqual(graph, ig._empty_graph())
+
 
 class TestCLI(unittest.TestCase):
     """Test CLI dispatch."""
@@ -709,6 +884,14 @@ class TestCLI(unittest.TestCase):
         )
         return result
 
+    def _run_batch(self, home, *args):
+        script = str(Path(__file__).parent.parent / "scripts" / "interest_graph.py")
+        env = dict(os.environ, HOME=home, USERPROFILE=home)
+        return subprocess.run(
+            [sys.executable, script, "batch"] + list(args),
+            capture_output=True, text=True, timeout=10, env=env,
+        )
+
     def test_load_command(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             fake_graph = Path(tmpdir) / "interest-graph.json"
@@ -762,6 +945,42 @@ class TestCLI(unittest.TestCase):
         ig.apply_decay(graph)
         self.assertEqual(graph["concepts"]["fresh"]["weight"], 5.0)
 
+    def test_batch_command_saves_once(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ops = [
+                {"op": "add-concepts", "data": [{"id": "docker"}]},
+                {"op": "record-session", "data": ["docker", "k8s"]},
+            ]
+            result = self._run_batch(tmpdir, json.dumps(ops))
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertIn("Applied 2 operations", result.stdout)
+            graph_file = Path(tmpdir) / ".claude" / "interest-graph.json"
+            saved = json.loads(graph_file.read_text(encoding="utf-8"))
+            self.assertFalse(graph_file.with_name(graph_file.name + ".tmp").exists())
+        self.assertIn("docker", saved["concepts"])
+        self.assertEqual(saved["meta"]["totalSessions"], 1)
+
+    def test_batch_command_rejects_malformed_op(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ops = [{"op": "add-concepts", "data": [{"id": "docker"}]}, {"op": "update-bandit", "data": {}}]
+            result = self._run_batch(tmpdir, json.dumps(ops))
+            self.assertEqual(result.returncode, 1)
+            self.assertNotIn("Traceback", result.stderr)
+            self.assertFalse((Path(tmpdir) / ".claude" / "interest-graph.json").exists())
+
+    def test_batch_command_invalid_json(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            result = self._run_batch(tmpdir, "[{not json")
+            self.assertEqual(result.returncode, 1)
+            self.assertNotIn("Traceback", result.stderr)
+            self.assertFalse((Path(tmpdir) / ".claude" / "interest-graph.json").exists())
+
+    def test_batch_command_requires_operations(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            result = self._run_batch(tmpdir)
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("Usage: interest_graph.py batch", result.stderr)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -66,6 +66,17 @@ class TestTagExtraction(unittest.TestCase):
         done, next_t = extract_tags(text)
         self.assertEqual(next_t, "lots of spaces")
 
+    def test_first_occurrence_wins(self):
+        text = "<explore-next>one</explore-next><explore-next>two</explore-next>"
+        done, next_t = extract_tags(text)
+        self.assertEqual(next_t, "one")
+
+    def test_next_nested_inside_done(self):
+        text = "<explore-done>stop <explore-next>inner</explore-next></explore-done>"
+        done, next_t = extract_tags(text)
+        self.assertEqual(done, "stop <explore-next>inner</explore-next>")
+        self.assertEqual(next_t, "inner")
+
     def test_tags_in_long_response(self):
         text = "# Analysis\n\nLong discussion...\n" * 50
         text += "\n<explore-next>Memory safety patterns</explore-next>\n"
@@ -54,6 +54,35 @@ class TestLoadTemplate(unittest.TestCase):
             self.assertEqual(tpl["mode"], "build")
             self.assertIn("Custom body", tpl["body"])
 
+    def test_edited_template_is_reloaded(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tpl_path = os.path.join(tmpdir, "custom.md")
+            with open(tpl_path, "w", encoding="utf-8") as f:
+                f.write("---\nname: custom\nmode: build\n---\nOld\n")
+            self.assertEqual(helpers.load_template("custom", tmpdir)["body"], "Old")
+            with open(tpl_path, "w", encoding="utf-8") as f:
+                f.write("---\nname: custom\nmode: build\n---\nNew body\n")
+            self.assertEqual(helpers.load_template("custom", tmpdir)["body"], "New body")
+
+    def test_same_size_rewrite_with_unchanged_mtime(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tpl_path = os.path.join(tmpdir, "custom.md")
+            with open(tpl_path, "w", encoding="utf-8") as f:
+                f.write("---\nname: custom\n---\nAAAA\n")
+            st = os.stat(tpl_path)
+            self.assertEqual(helpers.load_template("custom", tmpdir)["body"], "AAAA")
+            with open(tpl_path, "w", encoding="utf-8") as f:
+                f.write("---\nname: custom\n---\nBBBB\n")
+            os.utime(tpl_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+            self.assertEqual(helpers.load_template("custom", tmpdir)["body"], "BBBB")
+
+    def test_directory_named_like_template_skipped(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.makedirs(os.path.join(tmpdir, "custom"))
+            with open(os.path.join(tmpdir, "custom.md"), "w", encoding="utf-8") as f:
+                f.write("---\nname: custom\n---\nBody\n")
+            self.assertEqual(helpers.load_template("custom", tmpdir)["body"], "Body")
+
 
 class TestListTemplates(unittest.TestCase):
     """Test listing available templates."""
@@ -85,6 +114,30 @@ class TestListTemplates(unittest.TestCase):
         templates = helpers.list_templates("/nonexistent/dir")
         self.assertEqual(templates, [])
 
+    def test_added_and_edited_templates_listed(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            def write(name, desc):
+                with open(os.path.join(tmpdir, name + ".md"), "w", encoding="utf-8") as f:
+                    f.write(f"---\nname: {name}\ndescription: {desc}\nmode: build\n---\nBody\n")
+            write("alpha", "first")
+            self.assertEqual([t["name"] for t in helpers.list_templates(tmpdir)], ["alpha"])
+            write("beta", "second")
+            write("alpha", "first, revised")
+            templates = helpers.list_templates(tmpdir)
+            self.assertEqual([t["name"] for t in templates], ["alpha", "beta"])
+            self.assertEqual(templates[0]["description"], "first, revised")
+
+    def test_added_template_listed_with_unchanged_dir_mtime(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with open(os.path.join(tmpdir, "alpha.md"), "w", encoding="utf-8") as f:
+                f.write("---\nname: alpha\n---\nBody\n")
+            st = os.stat(tmpdir)
+            self.assertEqual([t["name"] for t in helpers.list_templates(tmpdir)], ["alpha"])
+            with open(os.path.join(tmpdir, "beta.md"), "w", encoding="utf-8") as f:
+                f.write("---\nname: beta\n---\nBody\n")
+            os.utime(tmpdir, ns=(st.st_atime_ns, st.st_mtime_ns))
+            self.assertEqual([t["name"] for t in helpers.list_templates(tmpdir)], ["alpha", "beta"])
+
 
 class TestBuiltinTemplateContent(unittest.TestCase):
     """Test that all built-in templates have required structure."""